@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+import config_table
+import records
+
+# Percentiles of price per sq.ft. kept for every group
+QUANTILES = {'ppsf_p25': 0.25, 'ppsf_p50': 0.5, 'ppsf_p75': 0.75}
+
+
+def build_market_table(projects_by_location):
+    """One configuration table over every location, with a price per sq.ft. column.
+
+    `project_idx` stays the index into that location's project list and
+    `project_key` identifies a project across locations. `ppsf` is NaN where
+    the price or the carpet area did not parse.
+    """
+    tables = [config_table.build_config_table(projects, location)
+              for location, projects in projects_by_location.items() if projects]
+    table = pd.concat(tables, ignore_index=True) if tables else config_table.build_config_table([])
+    table['location'] = table['location'].astype('category')
+    table['bhk'] = table['bhk'].astype('category')
+    table['project_key'] = table.groupby(['location', 'project_idx'], sort=False, observed=True).ngroup()
+    price = table['price_inr'].to_numpy(dtype='float64')
+    area = table['carpet_sqft'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table['ppsf'] = np.where((price > 0) & (area > 0), price / area, np.nan)
+    table['possession'] = np.where(table['ready_to_move'].to_numpy(), records.current_month(),
+                                   table['possession_month'].to_numpy())
+    return table
+
+
+def bhk_label(count):
+    return f"{count:g} BHK"
+
+
+def _group_stats(rows, keys):
+    """Projects, configurations, median price and area, and price per sq.ft. percentiles per group"""
+    grouped = rows.groupby(keys, observed=True, sort=True)
+    stats = grouped.agg(
+        projects=('project_key', 'nunique'),
+        configs=('project_key', 'size'),
+        price_p50=('price_inr', 'median'),
+        area_p50=('carpet_sqft', 'median'),
+    )
+    ppsf = grouped['ppsf'].quantile(list(QUANTILES.values())).unstack().reindex(columns=list(QUANTILES.values()))
+    ppsf.columns = list(QUANTILES)
+    return stats.join(ppsf)
+
+
+def market_aggregates(table):
+    """Group-by aggregates of a market table, computed once per dataset.
+
+    - `locality`: per location
+    - `bhk`: per bedroom count, every location together
+    - `locality_bhk`: per location and bedroom count
+    - `project_bhk`: per project and bedroom count, with `peer_ppsf` (the
+      median price per sq.ft. of that BHK in the project's location), `peers`
+      (projects it is compared with) and `discount` (how far below its peers
+      the project's median price per sq.ft. is, as a fraction)
+
+    Configurations without a price per sq.ft. are left out, and so are those
+    without a bedroom count from the BHK groups.
+    """
+    rows = table.loc[table['ppsf'].notna()]
+    with_bhk = rows.loc[rows['bhk_count'].notna()]
+    locality_bhk = _group_stats(with_bhk, ['location', 'bhk_count'])
+
+    project_bhk = with_bhk.groupby(['project_key', 'bhk_count'], sort=False).agg(
+        location=('location', 'first'),
+        project_name=('project_name', 'first'),
+        builder_name=('builder_name', 'first'),
+        possession=('possession', 'first'),
+        possession_date=('possession_date', 'first'),
+        configs=('ppsf', 'size'),
+        min_price=('price_inr', 'min'),
+        max_area=('carpet_sqft', 'max'),
+        ppsf=('ppsf', 'median'),
+    ).reset_index()
+    peers = locality_bhk[['ppsf_p50', 'projects']].rename(columns={'ppsf_p50': 'peer_ppsf', 'projects': 'peers'})
+    project_bhk = project_bhk.join(peers, on=['location', 'bhk_count'])
+    project_bhk['discount'] = 1 - project_bhk['ppsf'] / project_bhk['peer_ppsf']
+
+    return {
+        'locality': _group_stats(rows, ['location']),
+        'bhk': _group_stats(with_bhk, ['bhk_count']),
+        'locality_bhk': locality_bhk,
+        'project_bhk': project_bhk,
+    }
+
+
+def market_mask(table, locations=None, bhk_counts=None, price_range=None):
+    """Mask of the configurations in `locations` with a bedroom count in `bhk_counts`; None selects all"""
+    mask = np.ones(len(table), dtype=bool)
+    if locations:
+        mask &= table['location'].isin(locations).to_numpy()
+    if bhk_counts:
+        mask &= table['bhk_count'].isin(bhk_counts).to_numpy()
+    if price_range:
+        mask &= table['price_inr'].between(price_range[0], price_range[1]).to_numpy()
+    return mask
+
+
+def ppsf_stats(table, mask):
+    """Price per sq.ft. distribution of the selected configurations, see config_table.distribution"""
+    return config_table.distribution(table['ppsf'].to_numpy()[mask])
+
+
+def compare_localities(aggregates, locations=None, bhk_counts=None, value='ppsf_p50'):
+    """Location x BHK table of `value` (median price per sq.ft. by default), cheapest location first"""
+    stats = aggregates['locality_bhk']
+    if locations:
+        stats = stats.loc[stats.index.get_level_values('location').isin(locations)]
+    if bhk_counts:
+        stats = stats.loc[stats.index.get_level_values('bhk_count').isin(bhk_counts)]
+    pivot = stats[value].unstack('bhk_count')
+    pivot = pivot.loc[pivot.median(axis=1).sort_values().index]
+    pivot.columns = [bhk_label(count) for count in pivot.columns]
+    pivot.index = pivot.index.astype(str)
+    return pivot
+
+
+def best_value(aggregates, locations=None, bhk_counts=None, price_range=None, min_peers=3, n=20):
+    """Projects priced furthest below their location's median price per sq.ft. for the same BHK.
+
+    Ranks the `project_bhk` aggregate; groups with fewer than `min_peers`
+    projects have no meaningful median and are left out.
+    """
+    ranked = aggregates['project_bhk']
+    keep = ranked['peers'].to_numpy() >= min_peers
+    if locations:
+        keep &= ranked['location'].isin(locations).to_numpy()
+    if bhk_counts:
+        keep &= ranked['bhk_count'].isin(bhk_counts).to_numpy()
+    if price_range:
+        keep &= ranked['min_price'].between(price_range[0], price_range[1]).to_numpy()
+    return ranked.loc[keep].nlargest(n, 'discount')
@@ -1,10 +1,22 @@
 import streamlit as st
+import atexit
 import json
 import os
 from datetime import datetime
-import re
-import subprocess
-import sys
+from urllib.parse import urlparse
+import time
+
+import analytics
+import config_table
+import jobs
+import main
+import prewarm
+import records
+import resilience
+import scrape_cache
+import search_index
+import snapshot
+import store
 
 st.set_page_config(
     page_title="Housiey Property Search",
@@ -12,199 +24,286 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize session state for storing scraped data
-if 'scraped_data' not in st.session_state:
-    st.session_state.scraped_data = {}
-
-def load_project_data(location):
-    """Load project data from session state cache or JSON file"""
-    # First check session state (in-memory cache)
-    if location in st.session_state.scraped_data:
-        return st.session_state.scraped_data[location]
-    
-    # Fallback to JSON file if it exists (for local development)
+# Scrape failures after which the cached data is still served, reported as warnings
+STALE_DATA_ERRORS = {error.__name__ for error in (resilience.FetchError, resilience.CircuitOpenError,
+                                                   resilience.NoResultsError)}
+
+# Results are rendered one page at a time so rerun cost doesn't grow with the result count
+PAGE_SIZES = [10, 25, 50, 100]
+DEFAULT_PAGE_SIZE = int(os.environ.get("RESULTS_PAGE_SIZE", 25))
+if DEFAULT_PAGE_SIZE not in PAGE_SIZES:
+    PAGE_SIZES = sorted(PAGE_SIZES + [DEFAULT_PAGE_SIZE])
+
+@st.cache_resource
+def get_scrape_cache():
+    """Process-wide scraped data cache, shared by all sessions"""
+    return scrape_cache.ScrapeCache()
+
+def read_project_file(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        return records.normalize_projects(json.load(f))
+
+def read_project_data(location):
+    """Latest scrape of a location from the snapshot file, else the SQLite store, else its JSON file"""
+    # Only this location's block of the snapshot is read and decompressed
+    data = snapshot.load_projects(location)
+    if data is not None:
+        return data
+    data = store.load_projects(location)
+    if data is not None:
+        return data
+    # JSON files from before the store existed (local development)
     filename = f"projects_data_{location}.json"
     if os.path.exists(filename):
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            # Cache it in session state
-            st.session_state.scraped_data[location] = data
-            return data
-    
-    return []
-
-def parse_price(price_str):
-    """Convert price string to numeric value for comparison"""
-    if not price_str:
-        return 0
-    
-    # Extract numbers and units (L for Lakhs, Cr for Crores)
-    match = re.search(r'([\d.]+)\s*([LC])', price_str)
-    if match:
-        value = float(match.group(1))
-        unit = match.group(2)
-        
-        if unit == 'L':
-            return value * 100000  # Lakhs to actual value
-        elif unit == 'C':
-            return value * 10000000  # Crores to actual value
-    
-    return 0
-
-def parse_possession_date(possession_str):
-    """Parse possession date string to datetime for comparison"""
-    if not possession_str or possession_str == "N/A":
-        return None
-    
-    # Try to extract month and year
-    try:
-        # Handle formats like "Dec, 2025" or "Ready to Move"
-        if "Ready to Move" in possession_str or "Ready To Move" in possession_str:
-            return datetime.now()
-        
-        # Extract month and year
-        match = re.search(r'([A-Za-z]+)[,\s]+(\d{4})', possession_str)
-        if match:
-            month_str = match.group(1)
-            year = int(match.group(2))
-            
-            # Convert month name to number
-            month_map = {
-                'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
-                'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12,
-                'January': 1, 'February': 2, 'March': 3, 'April': 4, 'May': 5, 'June': 6,
-                'July': 7, 'August': 8, 'September': 9, 'October': 10, 'November': 11, 'December': 12
-            }
-            
-            month = month_map.get(month_str, 1)
-            return datetime(year, month, 1)
-    except:
-        pass
-    
+        return read_project_file(filename)
     return None
 
-def extract_bhk_types(projects):
-    """Extract unique BHK types from all projects"""
-    bhk_types = set()
-    for project in projects:
-        for config in project.get('configurations', []):
-            bhk = config.get('bhk', '')
-            if bhk:
-                bhk_types.add(bhk)
-    return sorted(list(bhk_types))
-
-def filter_projects(projects, search_query, price_range, bhk_filter, possession_range, area_range):
-    """Filter projects based on search query, price range, BHK, and possession date"""
-    filtered = []
-    
-    for project in projects:
-        # Search filter
-        if search_query:
-            project_name = project.get('project_name', '').lower()
-            builder_name = project.get('builder_name', '').lower()
-            if search_query.lower() not in project_name and search_query.lower() not in builder_name:
-                continue
-        
-        # # Carpet area filter
-        # valid_area = False
-        # for config in project.get('configurations', []):
-        #     size_str = config.get('size', '')
-        #     match = re.search(r'([\d.]+)\s*sq\.?ft\.?', size_str, re.IGNORECASE)
-        #     if match:
-        #         area = float(match.group(1))
-        #         if area_range[0] <= area <= area_range[1]:
-        #             valid_area = True
-        #             break
-        
-        # # If no configuration matches the carpet area range, skip the project
-        # if not valid_area:
-        #     continue
-        
-        # Possession date filter
-        possession_date = parse_possession_date(project.get('possession_date', ''))
-        if possession_date:
-            if not (possession_range[0] <= possession_date <= possession_range[1]):
-                continue
-        
-        # Filter configurations based on price and BHK
-        valid_configs = []
-        for config in project.get('configurations', []):
-            price = parse_price(config.get('price', ''))
-            bhk = config.get('bhk', '')
-            
-            # Price filter
-            if price < price_range[0] or price > price_range[1]:
-                continue
-            
-            # BHK filter
-            if bhk_filter and bhk not in bhk_filter:
-                continue
-
-            # size filter
-            size_str = config.get('size', '')
-            match = re.search(r'([\d.]+)\s*sq\.?ft\.?', size_str, re.IGNORECASE)
-            if match:
-                area = float(match.group(1))
-                if area < area_range[0] or area > area_range[1]:
-                    continue
-            
-            valid_configs.append(config)
-        
-        # Only include project if it has valid configurations
-        if valid_configs:
-            project_copy = project.copy()
-            project_copy['configurations'] = valid_configs
-            filtered.append(project_copy)
+def load_project_data(location):
+    """Load project data from the shared cache, SQLite store or JSON file"""
+    # First check the process-wide in-memory cache
+    cache = get_scrape_cache()
+    data = cache.get(location)
+    if data is not None:
+        return data
     
-    return filtered
-
-def run_scraper(location, min_price=2500000, max_price=9999999999, config=""):
-    """Run the main.py scraper with specified parameters and store in memory"""
+    if cache.is_loading(location):
+        # A scrape holds the load until it finishes; show what is on disk meanwhile instead of waiting
+        data = read_project_data(location)
+    else:
+        # Fall back to disk; single-flight, so sessions opening the same location read it once
+        data = cache.get_or_load(location, lambda: read_project_data(location))
+    return data if data is not None else []
+
+def get_config_table(location, projects):
+    """Columnar one-row-per-configuration view of the projects, built once per load"""
+    tables = st.session_state.setdefault('config_tables', {})
+    cached = tables.get(location)
+    if cached is None or cached[0] is not projects:
+        cached = (projects, config_table.build_config_table(projects, location))
+        tables[location] = cached
+    return cached[1]
+
+def get_dataset_stats(location, projects):
+    """BHK counts, price/area distributions and possession histogram of the loaded projects, built once per load"""
+    stats = st.session_state.setdefault('dataset_stats', {})
+    cached = stats.get(location)
+    if cached is None or cached[0] is not projects:
+        cached = (projects, config_table.dataset_stats(get_config_table(location, projects)))
+        stats[location] = cached
+    return cached[1]
+
+def round_up(value, step):
+    return int(-(-value // step) * step)
+
+def get_market_data(locations):
+    """Every location with data as one price per sq.ft. table plus its group-by aggregates.
+
+    Built once per session and rebuilt only when one of the locations has been reloaded.
+    """
+    loaded = {loc: load_project_data(loc) for loc in locations}
+    loaded = {loc: projects for loc, projects in loaded.items() if projects}
+    cached = st.session_state.get('market_data')
+    if cached is None or cached[0].keys() != loaded.keys() or any(cached[0][loc] is not p for loc, p in loaded.items()):
+        table = analytics.build_market_table(loaded)
+        cached = (loaded, table, analytics.market_aggregates(table))
+        st.session_state.market_data = cached
+    return cached[1], cached[2]
+
+def format_inr(value):
+    return f"₹{value / 10000000:.2f}Cr" if value >= 10000000 else f"₹{value / 100000:.1f}L"
+
+def show_market_analytics(locations):
+    """Compare price per sq.ft. across every location with data"""
+    table, aggregates = get_market_data(locations)
+    st.header("📊 Compare Locations")
+    if not len(table):
+        st.warning("⚠️ No scraped data yet. Switch to Search and scrape a location first.")
+        return
+
+    all_locations = list(aggregates['locality'].index.astype(str))
+    selected_locations = st.sidebar.multiselect(
+        "Locations",
+        options=all_locations,
+        format_func=lambda x: x.capitalize().replace('-', ' '),
+        help="Leave empty to compare every location"
+    )
+    bhk_counts = st.sidebar.multiselect("BHK", options=list(aggregates['bhk'].index), format_func=analytics.bhk_label)
+    max_price = round_up(table['price_inr'].max(), 500000)
+    price_range = st.sidebar.slider("Budget (₹)", min_value=0, max_value=max_price, value=(0, max_price), step=500000)
+
+    # Distribution over the selected configurations: one vectorized mask over every location
+    mask = analytics.market_mask(table, selected_locations, bhk_counts, price_range)
+    stats = analytics.ppsf_stats(table, mask)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Configurations", f"{int(mask.sum()):,}", help=f"of {len(table):,} in {len(all_locations)} locations")
+    if stats:
+        col2.metric("Median ₹/sq.ft.", f"₹{stats['p50']:,.0f}")
+        col3.metric("Middle 50%", f"₹{stats['p25']:,.0f} - ₹{stats['p75']:,.0f}")
+        col4.metric("90% between", f"₹{stats['p5']:,.0f} - ₹{stats['p95']:,.0f}")
+    else:
+        st.info("No configurations with both a price and a carpet area match these filters.")
+
+    # Precomputed per location / BHK aggregates, only filtered here
+    st.subheader("Median ₹/sq.ft. by location and BHK")
+    pivot = analytics.compare_localities(aggregates, selected_locations, bhk_counts)
+    st.bar_chart(pivot.median(axis=1).rename("₹/sq.ft."))
+    st.dataframe(pivot.style.format("₹{:,.0f}", na_rep="–"))
+
+    locality = aggregates['locality']
+    if selected_locations:
+        locality = locality.loc[locality.index.isin(selected_locations)]
+    with st.expander("Location summary (all BHKs)"):
+        st.dataframe({
+            'Location': [str(loc).capitalize() for loc in locality.index],
+            'Projects': locality['projects'],
+            'Configurations': locality['configs'],
+            'Median price': [format_inr(v) for v in locality['price_p50']],
+            'Median area (sq.ft.)': locality['area_p50'].round(0),
+            'P25 ₹/sq.ft.': locality['ppsf_p25'].round(0),
+            'Median ₹/sq.ft.': locality['ppsf_p50'].round(0),
+            'P75 ₹/sq.ft.': locality['ppsf_p75'].round(0),
+        }, hide_index=True)
+
+    st.subheader("🏷️ Best value")
+    st.caption("Projects with the lowest ₹/sq.ft. compared to the median of the same BHK in their location")
+    ranked = analytics.best_value(aggregates, selected_locations, bhk_counts, price_range)
+    if ranked.empty:
+        st.info("Not enough comparable projects for these filters.")
+        return
+    st.dataframe({
+        'Project': ranked['project_name'],
+        'Builder': ranked['builder_name'],
+        'Location': [str(loc).capitalize() for loc in ranked['location']],
+        'BHK': [analytics.bhk_label(count) for count in ranked['bhk_count']],
+        'From': [format_inr(v) for v in ranked['min_price']],
+        '₹/sq.ft.': ranked['ppsf'].round(0),
+        'Location median': ranked['peer_ppsf'].round(0),
+        'Below median': [f"{v:.0%}" for v in ranked['discount']],
+        'Possession': ranked['possession_date'].fillna('N/A'),
+    }, hide_index=True)
+
+def get_search_index(location, projects):
+    """Name index over the loaded projects for prefix and typo-tolerant search, built once per load"""
+    indexes = st.session_state.setdefault('search_indexes', {})
+    cached = indexes.get(location)
+    if cached is None or cached[0] is not projects:
+        entries = ((i, p.get('project_name'), p.get('builder_name')) for i, p in enumerate(projects))
+        cached = (projects, search_index.SearchIndex(entries))
+        indexes[location] = cached
+    return cached[1]
+
+@st.cache_resource
+def get_scraper_service():
+    """Process-wide scraper with a warm browser pool, shared by all sessions"""
+    # Incremental, so repeat scrapes only write what changed; the app reads the snapshot, not JSON
+    service = main.ScraperService(incremental=True, export_json=False)
+    atexit.register(service.close)
+    return service
+
+@st.cache_resource
+def get_job_scheduler():
+    """Process-wide background scrape jobs, shared by all sessions"""
+    return jobs.JobScheduler()
+
+def run_scraper(location, cache, service, job, min_price=2500000, max_price=9999999999, config=""):
+    """Run the scraper in-process with a pooled browser and store in the shared cache.
+
+    Projects are streamed into the job as they are parsed, so the UI can show
+    them before the scrape has finished. When housiey is failing the job fails
+    with the typed error and the last saved data keeps being served.
+    """
+    # Concurrent requests for the same location share one in-flight scrape
     try:
-        # Run main.py with the location parameter
-        result = subprocess.run(
-            [sys.executable, "main.py", "--location", location, 
-             "--min_price", str(min_price), "--max_price", str(max_price),
-             "--config", config],
-            capture_output=True,
-            text=True,
-            timeout=120  # 2 minutes timeout
+        return cache.get_or_load(
+            location,
+            lambda: service.scrape(location, min_price, max_price, config, on_project=job.add_result, log=job.log),
+            force=True,
+        )
+    except resilience.ScrapeError as e:
+        job.log(f"{type(e).__name__}: {e}")
+        # The cached entry is left as it was; load the saved data if nothing is cached
+        if cache.get(location) is None and cache.get_or_load(location, lambda: read_project_data(location)) is None:
+            job.log("No saved data to fall back to")
+        else:
+            job.log("Serving the last saved data")
+        raise
+
+def start_scraper(location):
+    """Queue a background scrape of `location` and return its job id"""
+    # Resolved here, on the script thread, rather than in the worker
+    cache = get_scrape_cache()
+    service = get_scraper_service()
+    return get_job_scheduler().submit(location, lambda job: run_scraper(location, cache, service, job))
+
+def prewarm_location(location, cache, service, job):
+    """Pre-warm job: reuse data recently stored on disk, scrape only if it is stale or missing"""
+    run = store.last_run(location)
+    if run and cache.get(location) is None and time.time() - run['scraped_at'] < cache.ttl(location) / 2:
+        job.log(f"Loading {location} from {store.DEFAULT_DB}")
+        return cache.get_or_load(location, lambda: read_project_data(location))
+    return run_scraper(location, cache, service, job)
+
+@st.cache_resource
+def get_prewarmer():
+    """Background refresh of the most viewed locations, shared by all sessions"""
+    cache = get_scrape_cache()
+    service = get_scraper_service()
+    prewarmer = prewarm.Prewarmer(
+        cache,
+        get_job_scheduler(),
+        lambda location: (lambda job: prewarm_location(location, cache, service, job)),
+        max_concurrent=int(os.environ.get("PREWARM_MAX_BROWSERS", 1)),
+        max_per_hour=int(os.environ.get("PREWARM_MAX_PER_HOUR", 6)),
+        seed=main.COMMON_LOCATIONS,
+    )
+    return prewarmer.start()
+
+@st.fragment(run_every=2)
+def show_scrape_progress(job_id):
+    """Poll a running scrape job; reruns the whole app once it has finished"""
+    status = get_job_scheduler().status(job_id)
+    if status is None or status['state'] not in (jobs.QUEUED, jobs.RUNNING):
+        st.rerun()
+    st.info(f"⏳ Scraping {status['location'].capitalize()}... {status['state']} for {status['elapsed']}s, "
+            f"{status['result_count']} projects so far")
+    if status['progress']:
+        st.caption(status['progress'][:200])
+    # Projects parsed so far, streamed from the running scrape
+    partial = get_job_scheduler().partial_results(job_id)
+    if partial:
+        st.dataframe(
+            [{'Project': p.get('project_name', 'N/A'), 'Configs': len(p.get('configurations', []))} for p in partial[-50:]],
+            hide_index=True,
         )
-        
-        if result.returncode == 0:
-            # Load the scraped data and store in session state
-            filename = f"projects_data_{location}.json"
-            if os.path.exists(filename):
-                with open(filename, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    st.session_state.scraped_data[location] = data
-        
-        return result.returncode == 0, result.stdout, result.stderr
-    except subprocess.TimeoutExpired:
-        return False, "", "Scraping timed out after 2 minutes"
-    except Exception as e:
-        return False, "", str(e)
 
 # Main app
 st.title("🏠 Housiey Property Search")
 # st.markdown("Find your dream property in Pune")
 
+# Search one location, or compare price per sq.ft. across all of them
+mode = st.sidebar.radio("Mode", ["Search", "Compare locations"], horizontal=True)
+
 # Sidebar filters
 st.sidebar.header("Filters")
 
-# Get available locations from session state cache and JSON files
-available_locations = list(st.session_state.scraped_data.keys())
+# Get available locations from the shared cache, SQLite store and JSON files
+available_locations = get_scrape_cache().locations()
+for loc in store.locations():
+    if loc not in available_locations:
+        available_locations.append(loc)
+
+# Locations in the snapshot manifest (no directory scan; re-read only when the file changes)
+for loc in snapshot.locations():
+    if loc not in available_locations:
+        available_locations.append(loc)
 
-# Also check for JSON files (local development)
-for file in os.listdir('.'):
-    if file.startswith('projects_data_') and file.endswith('.json'):
-        location = file.replace('projects_data_', '').replace('.json', '')
-        if location not in available_locations:
-            available_locations.append(location)
+if mode == "Compare locations":
+    # Every location with scraped data so far, loaded into one table
+    show_market_analytics(available_locations)
+    st.stop()
 
 # Add common locations if not present
-common_locations = ['wakad', 'tathawade', 'hinjewadi', 'baner', 'pimple-saudagar', 'balewadi', 'punawale', 'chinchwad', 'moshi', 'ravet', 'kharadi', 'akurdi', 'bavdhan']
-for loc in common_locations:
+for loc in main.COMMON_LOCATIONS:
     if loc not in available_locations:
         available_locations.append(loc)
 
@@ -244,20 +343,66 @@ st.sidebar.subheader("🔄 Update Data")
 #         help="Leave empty for all configurations or specify config IDs"
 #     )
 
+# Count each location a session switches to, so popular ones are refreshed ahead of time
+if st.session_state.get('viewed_location') != location:
+    st.session_state.viewed_location = location
+    get_prewarmer().record_request(location)
+
+# Scrapes run in the background; this session remembers the jobs it started
+if 'scrape_jobs' not in st.session_state:
+    st.session_state.scrape_jobs = {}
+scheduler = get_job_scheduler()
+job_id = st.session_state.scrape_jobs.get(location) or scheduler.active_job(location)
+job = scheduler.status(job_id) if job_id else None
+scraping = job is not None and job['state'] in (jobs.QUEUED, jobs.RUNNING)
+
+# After repeated failures the scraper stops hitting housiey for a while and saved data is served
+if resilience.get_circuit_breaker().state(urlparse(get_scraper_service().base_url).netloc) == "open":
+    st.sidebar.warning("⚠️ Housiey has been failing, scraping is paused for a few minutes. Showing saved data.")
+
 # Run scraper button
-if st.sidebar.button("🔄 Scrape Data for " + location.capitalize().replace('-', ' '), type="primary"):
-    with st.spinner(f"Scraping property data for {location.capitalize()}... This may take 1-2 minutes."):
-        success, stdout, stderr = run_scraper(location) #, scraper_min_price, scraper_max_price, scraper_config)
-        
-        if success:
-            st.sidebar.success(f"✅ Successfully scraped data for {location.capitalize()}!")
-            # Force reload
-            st.rerun()
-        else:
-            st.sidebar.error(f"❌ Failed to scrape data: {stderr}")
-            if stdout:
-                with st.sidebar.expander("View output"):
-                    st.code(stdout)
+if st.sidebar.button("🔄 Scrape Data for " + location.capitalize().replace('-', ' '), type="primary", disabled=scraping):
+    st.session_state.scrape_jobs[location] = start_scraper(location) #, scraper_min_price, scraper_max_price, scraper_config)
+    st.rerun()
+
+if scraping:
+    # Cached data stays usable below while the job runs
+    with st.sidebar:
+        show_scrape_progress(job_id)
+elif job is not None and st.session_state.scrape_jobs.get(location) == job_id:
+    # Report a finished job of this session once
+    del st.session_state.scrape_jobs[location]
+    if job['state'] == jobs.DONE:
+        st.sidebar.success(f"✅ Successfully scraped data for {location.capitalize()} in {job['elapsed']}s!")
+    elif job['error_type'] in STALE_DATA_ERRORS:
+        st.sidebar.warning(f"⚠️ Could not refresh {location.capitalize()} ({job['error_type']}: {job['error']}). "
+                           f"Showing the last saved data.")
+        if job['output']:
+            with st.sidebar.expander("View output"):
+                st.code(job['output'])
+    else:
+        st.sidebar.error(f"❌ Failed to scrape data: {job['error']}")
+        if job['output']:
+            with st.sidebar.expander("View output"):
+                st.code(job['output'])
+
+# Where the time of the last stored scrape went
+last_run = None if scraping else store.last_run(location)
+last_metrics = store.run_metrics(last_run['id']) if last_run else None
+if last_metrics:
+    with st.sidebar.expander("⏱️ Last scrape breakdown"):
+        counters = last_metrics['counters']
+        st.caption(f"{datetime.fromtimestamp(last_run['scraped_at']):%d %b %H:%M} via {last_run['fetcher']}, "
+                   f"{counters.get('duration_seconds', 0):.1f}s total, {counters.get('bytes_transferred', 0) / 1024:.0f} KiB in "
+                   f"{int(counters.get('requests', 0))} requests; {int(counters.get('cards_found', 0))} cards found, "
+                   f"{int(counters.get('cards_kept', 0))} kept"
+                   + (f"; peak RSS {counters['peak_rss_bytes'] / 2 ** 20:.0f} MiB" if counters.get('peak_rss_bytes') else ""))
+        phases = last_metrics['phases']
+        st.table({
+            'Phase': list(phases),
+            'Seconds': [round(seconds, 3) for seconds, _ in phases.values()],
+            'Calls': [calls for _, calls in phases.values()],
+        })
 
 st.sidebar.markdown("---")
 
@@ -266,24 +411,31 @@ projects = load_project_data(location)
 
 if not projects:
     st.warning(f"⚠️ No projects found for {location.capitalize().replace('-', ' ')}")
-    st.info("💡 Click the 'Scrape Data' button in the sidebar to fetch fresh data for this location.")
+    if scraping:
+        st.info("⏳ Scraping in progress, results will appear here when it finishes.")
+    else:
+        st.info("💡 Click the 'Scrape Data' button in the sidebar to fetch fresh data for this location.")
     
     # Show cached locations if any exist
-    if st.session_state.scraped_data:
-        cached_locs = ", ".join([loc.capitalize() for loc in st.session_state.scraped_data.keys()])
+    cached = get_scrape_cache().locations()
+    if cached:
+        cached_locs = ", ".join([loc.capitalize() for loc in cached])
         st.info(f"📦 Data available in cache for: {cached_locs}")
     else:
-        st.info("📦 No data in cache. Data will be cleared when the app restarts.")
+        st.info("📦 No data in cache yet. Scraped data is saved to disk and kept across restarts.")
     
     st.stop()
 
+table = get_config_table(location, projects)
+stats = get_dataset_stats(location, projects)
+
 # Search box
 search_query = st.sidebar.text_input("🔍 Search Project or Builder", "")
 
-# Price range slider
+# Price range slider, bounded by the prices in this location
 st.sidebar.subheader("Price Range")
 min_price = 0
-max_price = 50000000  # 5 Crores
+max_price = round_up(stats['price']['max'], 500000) if stats['price'] else 50000000
 
 price_range = st.sidebar.slider(
     "Select Price Range (₹)",
@@ -299,20 +451,18 @@ price_display = (
     f"₹{price_range[0]/100000:.1f}L - ₹{price_range[1]/10000000:.1f}Cr"
 )
 st.sidebar.write(f"Selected: {price_display}")
+if stats['price']:
+    st.sidebar.caption(f"Median ₹{stats['price']['p50']/100000:.1f}L, "
+                       f"90% between ₹{stats['price']['p5']/100000:.1f}L and ₹{stats['price']['p95']/100000:.1f}L")
 
-# BHK Configuration filter
+# BHK Configuration filter; rendered below once the other filters are known, for live counts
 st.sidebar.subheader("BHK Configuration")
-bhk_types = extract_bhk_types(projects)
-bhk_filter = st.sidebar.multiselect(
-    "Select BHK Types",
-    options=bhk_types,
-    default=bhk_types[3:5] if len(bhk_types) > 2 else bhk_types  # Default to 1BHK and 2BHK if available
-)
+bhk_section = st.sidebar.container()
 
 # Carpet Area filter
 st.sidebar.subheader("Carpet Area (sq.ft.)")
 min_area = 0
-max_area = 5000
+max_area = round_up(stats['area']['max'], 25) if stats['area'] else 5000
 area_range = st.sidebar.slider(
     "Select Carpet Area Range",
     min_value=min_area,
@@ -326,35 +476,80 @@ area_range = st.sidebar.slider(
 # Possession date filter
 st.sidebar.subheader("Possession Timeline")
 current_year = datetime.now().year
+possession_years = stats['possession_years']
 possession_year_range = st.sidebar.slider(
     "Possession Year",
     min_value=current_year,
-    max_value=current_year + 10,
+    max_value=max([current_year + 10, *possession_years]),
     value=(current_year, current_year + 5)
 )
+if possession_years:
+    st.sidebar.caption("Projects by year: " + ", ".join(
+        f"{year}: {count}" for year, count in possession_years.items() if year >= current_year))
 
 possession_range = (
     datetime(possession_year_range[0], 1, 1),
     datetime(possession_year_range[1], 12, 31)
 )
 
-# Filter projects
-filtered_projects = filter_projects(
-    projects, 
-    search_query, 
-    price_range, 
-    bhk_filter, 
-    possession_range,
-    area_range
+# Filter projects: one mask over the configuration table; project dicts are built for the shown page only
+mask = config_table.filter_mask(table, price_range, [], possession_range, area_range)
+# Search goes through the name index: prefix and typo-tolerant, ranked by relevance
+matches = None
+if search_index.tokenize(search_query):
+    matches = dict(get_search_index(location, projects).search(search_query))
+    mask = mask & table['project_idx'].isin(list(matches)).to_numpy()
+
+# BHK options carry how many configurations match the other filters
+bhk_types = list(stats['bhk'])
+facets = config_table.facet_counts(table, mask)
+bhk_filter = bhk_section.multiselect(
+    "Select BHK Types",
+    options=bhk_types,
+    default=sorted(bhk_types)[3:5] if len(bhk_types) > 2 else bhk_types,
+    format_func=lambda bhk: f"{bhk} ({facets.get(bhk, 0)})"
 )
+mask = mask & config_table.bhk_mask(table, bhk_filter)
+
+summary = config_table.summarize_projects(table, mask)
+if matches is not None:
+    summary['relevance'] = summary.index.map(matches)
 
 # Display results
 st.header(f"Properties in {location.capitalize()}")
-st.write(f"Found **{len(filtered_projects)}** properties matching your criteria")
+st.write(f"Found **{len(summary)}** properties matching your criteria")
+
+# Result layout: sort order, page size and cards vs one compact table
+col_sort, col_size, col_view = st.columns([2, 1, 1])
+sort_options = [key for key in config_table.SORT_KEYS if matches is not None or key != 'Relevance']
+sort_key = col_sort.selectbox("Sort by", options=sort_options)
+page_size = col_size.selectbox("Per page", options=PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE))
+result_view = col_view.radio("Show as", options=["Cards", "Table"], horizontal=True)
+
+page_count = max(1, -(-len(summary) // page_size))
+# Keep the page in range when a filter shrinks the results
+st.session_state['results_page'] = min(st.session_state.get('results_page', 1), page_count)
+page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, step=1, key='results_page')
+
+ordered = config_table.sort_projects(summary, sort_key)
+page_ids = ordered.index[(page - 1) * page_size:page * page_size].tolist()
+
+if result_view == "Table":
+    rows = config_table.config_rows(table, mask, page_ids)
+    st.dataframe(
+        rows[['project_name', 'builder_name', 'bhk', 'size', 'price', 'possession_date']].rename(columns={
+            'project_name': 'Project', 'builder_name': 'Builder', 'bhk': 'BHK', 'size': 'Size',
+            'price': 'Price', 'possession_date': 'Possession',
+        }),
+        hide_index=True,
+    )
+    page_projects = []
+else:
+    page_projects = config_table.group_projects(table, mask, projects, order=page_ids)
 
 # Display projects
-for i, project in enumerate(filtered_projects):
-    with st.expander(f"**{project.get('project_name', 'N/A')}** by {project.get('builder_name', 'N/A')}", expanded=i < 3):
+for i, project in enumerate(page_projects):
+    with st.expander(f"**{project.get('project_name', 'N/A')}** by {project.get('builder_name', 'N/A')}", expanded=page == 1 and i < 3):
         col1, col2 = st.columns([1, 2])
         proj_name_link = f"https://housiey.com/projects/{project.get('project_name', '').lower().replace(' ', '-').replace('.', '')}"
         
@@ -385,11 +580,11 @@ for i, project in enumerate(filtered_projects):
         st.markdown("---")
 
 # Summary statistics
-if filtered_projects:
+if len(summary):
     st.sidebar.markdown("---")
     st.sidebar.subheader("Summary")
-    st.sidebar.metric("Total Projects", len(filtered_projects))
+    st.sidebar.metric("Total Projects", len(summary))
     
     # Count total configurations
-    total_configs = sum(len(p.get('configurations', [])) for p in filtered_projects)
-    st.sidebar.metric("Total Configurations", total_configs)
+    total_configs = int(mask.sum())
+    st.sidebar.metric("Total Configurations", total_configs, help=f"of {stats['configs']} in {location}")
@@ -0,0 +1,60 @@
+"""Benchmark the cross-location price per sq.ft. analytics on synthetic data.
+
+Times building the market table and its group-by aggregates once, then the
+queries the app runs on every interaction (distribution of the selection,
+location x BHK comparison, best value ranking) against recomputing the
+ranking from the configuration table each time.
+
+    python benchmarks/bench_analytics.py --configs 100000 250000
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analytics  # noqa: E402
+from bench_filter import synthetic_projects, timed  # noqa: E402
+
+QUERIES = [
+    ("every location", (None, None, None)),
+    ("2-3 BHK under 1Cr", (None, [2.0, 3.0], (0, 10000000))),
+    ("two locations, 2 BHK", (['wakad', 'baner'], [2.0], None)),
+]
+
+
+def by_location(projects):
+    """Synthetic projects split by the location their name starts with"""
+    grouped = {}
+    for project in projects:
+        grouped.setdefault(project['project_name'].rsplit(' Heights', 1)[0].lower(), []).append(project)
+    return grouped
+
+
+def query(table, aggregates, locations, bhk_counts, price_range):
+    mask = analytics.market_mask(table, locations, bhk_counts, price_range)
+    return (analytics.ppsf_stats(table, mask), analytics.compare_localities(aggregates, locations, bhk_counts),
+            analytics.best_value(aggregates, locations, bhk_counts, price_range))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", type=int, nargs="+", default=[10000, 100000, 250000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'Configs':>8} {'Query':<22} {'Build s':>8} {'Agg s':>8} {'Query s':>8} {'Recompute s':>12} {'Speedup':>8}")
+    for n in args.configs:
+        projects = by_location(synthetic_projects(n))
+        build, table = timed(lambda: analytics.build_market_table(projects), 1)
+        aggregate, aggregates = timed(lambda: analytics.market_aggregates(table), 1)
+        for name, filters in QUERIES:
+            query_time, _ = timed(lambda: query(table, aggregates, *filters), args.repeat)
+            # Without precomputed aggregates every interaction groups the whole table again
+            recompute_time, _ = timed(lambda: query(table, analytics.market_aggregates(table), *filters), args.repeat)
+            print(f"{len(table):>8} {name:<22} {build:>8.3f} {aggregate:>8.3f} {query_time:>8.4f} "
+                  f"{recompute_time:>12.4f} {recompute_time / query_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Benchmark the columnar filter engine against the per-record loop it replaced.
+
+Builds a synthetic dataset spread over every common location and times
+what one app rerun does for a set of typical slider filters: mask the
+configuration table, summarize and sort the matching projects and build
+the dicts of the first page. The reference filters every project with the
+loop, sorts them and slices the same page. Building the table is paid once
+per load and reported on its own, with the number of reruns it takes to
+pay it back.
+
+    python benchmarks/bench_filter.py --configs 100000 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config_table  # noqa: E402
+import records  # noqa: E402
+from main import COMMON_LOCATIONS  # noqa: E402
+
+BHKS = ['1 BHK', '2 BHK', '2.5 BHK', '3 BHK', '4 BHK']
+MONTHS = ['Jan', 'Mar', 'Jun', 'Sep', 'Dec']
+
+
+def synthetic_projects(n_configs, seed=0):
+    """Project dicts, with numeric fields, totalling about `n_configs` configurations"""
+    rng = random.Random(seed)
+    projects = []
+    total = 0
+    while total < n_configs:
+        location = rng.choice(COMMON_LOCATIONS)
+        configs = []
+        for _ in range(rng.randint(1, 6)):
+            lakhs = rng.randint(30, 400)
+            price = f"{lakhs} L" if lakhs < 100 else f"{lakhs / 100:.2f} Cr"
+            configs.append({'bhk': rng.choice(BHKS), 'size': f"{rng.randint(350, 2500)} sq.ft.", 'price': price})
+        possession = "Ready To Move" if rng.random() < 0.1 else f"{rng.choice(MONTHS)}, {rng.randint(2025, 2032)}"
+        projects.append({
+            'project_name': f"{location.title()} Heights {len(projects)}",
+            'builder_name': f"Builder {rng.randint(1, 500)}",
+            'possession_date': possession,
+            'configurations': configs,
+        })
+        total += len(configs)
+    return records.normalize_projects(projects)
+
+
+def loop_filter(projects, price_range, bhk_filter, possession_range, area_range):
+    """The pre-columnar per-record implementation, kept as the reference"""
+    filtered = []
+    possession_lo = possession_range[0].year * 100 + possession_range[0].month
+    possession_hi = possession_range[1].year * 100 + possession_range[1].month
+    this_month = records.current_month()
+    for project in projects:
+        possession_month = this_month if project['ready_to_move'] else project['possession_month']
+        if possession_month and not (possession_lo <= possession_month <= possession_hi):
+            continue
+        valid_configs = []
+        for config in project['configurations']:
+            if not price_range[0] <= config['price_inr'] <= price_range[1]:
+                continue
+            if bhk_filter and config['bhk'] not in bhk_filter:
+                continue
+            area = config['carpet_sqft']
+            if area is not None and not area_range[0] <= area <= area_range[1]:
+                continue
+            valid_configs.append(config)
+        if valid_configs:
+            project_copy = project.copy()
+            project_copy['configurations'] = valid_configs
+            filtered.append(project_copy)
+    return filtered
+
+
+def app_page(table, projects, filters, sort_key, page_size):
+    """One rerun of the app: the first page of projects matching `filters`, sorted by `sort_key`"""
+    mask = config_table.filter_mask(table, *filters)
+    summary = config_table.sort_projects(config_table.summarize_projects(table, mask), sort_key)
+    return config_table.group_projects(table, mask, projects, order=summary.index[:page_size].tolist())
+
+
+def loop_page(projects, filters, page_size):
+    """The same page through the loop, sorted by cheapest matching configuration"""
+    filtered = loop_filter(projects, *filters)
+    filtered.sort(key=lambda project: min(config['price_inr'] for config in project['configurations']))
+    return filtered[:page_size]
+
+
+FILTERS = [
+    ("everything", ((0, 50000000), [], (datetime(2020, 1, 1), datetime(2040, 12, 31)), (0, 5000))),
+    ("2-3 BHK under 1Cr", ((0, 10000000), ['2 BHK', '3 BHK'], (datetime(2026, 1, 1), datetime(2031, 12, 31)), (0, 5000))),
+    ("600-1200 sq.ft.", ((0, 50000000), [], (datetime(2026, 1, 1), datetime(2036, 12, 31)), (600, 1200))),
+]
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", type=int, nargs="+", default=[10000, 100000, 250000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--page-size", type=int, default=25)
+    args = parser.parse_args()
+
+    print(f"{'Configs':>8} {'Filter':<20} {'Build s':>8} {'Mask s':>8} {'Rerun s':>8} {'Loop s':>8} {'Speedup':>8} "
+          f"{'Break-even':>10}")
+    for n in args.configs:
+        projects = synthetic_projects(n)
+        build, table = timed(lambda: config_table.build_config_table(projects), 1)
+        for name, filters in FILTERS:
+            # Grouping every match must still agree with the loop, not just the first page
+            mask_time, mask = timed(lambda: config_table.filter_mask(table, *filters), args.repeat)
+            assert config_table.group_projects(table, mask, projects) == loop_filter(projects, *filters), \
+                f"columnar and loop results differ for {name!r}"
+            rerun_time, result = timed(lambda: app_page(table, projects, filters, 'Price (low to high)', args.page_size),
+                                       args.repeat)
+            loop_time, expected = timed(lambda: loop_page(projects, filters, args.page_size), args.repeat)
+            assert result == expected, f"columnar and loop pages differ for {name!r}"
+            saved = loop_time - rerun_time
+            break_even = f"{build / saved:>9.1f}r" if saved > 0 else f"{'never':>10}"
+            print(f"{len(table):>8} {name:<20} {build:>8.3f} {mask_time:>8.4f} {rerun_time:>8.4f} {loop_time:>8.4f} "
+                  f"{loop_time / rerun_time:>7.1f}x {break_even}")
+
+
+if __name__ == "__main__":
+    main()
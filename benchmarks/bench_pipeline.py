@@ -0,0 +1,196 @@
+"""Benchmark the parse -> filter pipeline on the listing page fixtures, offline.
+
+Runs card parsing (every available parser), the "Sold Out" filtering done
+after parsing, price/possession parsing and the app's project filter against
+the pages under fixtures/, and against pages with the cards of each fixture
+repeated to 10x/100x its card count. The fixtures are synthetic: built by
+hand to mirror housiey's card markup, not saved from the live site, so the
+numbers measure this code rather than real listing pages. Reports
+throughput, p50/p95 latency and peak traced memory per case (Python allocations
+only, so lxml's own C buffers do not show up).
+
+    python benchmarks/bench_pipeline.py --scales 1 10 100
+    python benchmarks/bench_pipeline.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_pipeline.py --baseline benchmarks/baseline.json --tolerance 0.25
+
+With --baseline the exit status is 1 when any case got slower (p50) or
+used more memory than the baseline allows.
+"""
+import argparse
+import copy
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config_table  # noqa: E402
+import records  # noqa: E402
+from main import CARD_CLASS_RE, NAME_CLASS_RE, PARSERS, filter_sold_out, parse_projects  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, 'fixtures')
+# The app's default view: every price and area, possession within the next five years
+APP_FILTERS = ((0, 50000000), [], (datetime(datetime.now().year, 1, 1), datetime(datetime.now().year + 5, 12, 31)),
+               (0, 5000))
+
+
+def fixture_pages(fixtures=FIXTURES):
+    """{location: html} of the synthetic listing pages, fixtures/<location>/index.html"""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(fixtures, '*', 'index.html'))):
+        with open(path, encoding='utf-8') as f:
+            pages[os.path.basename(os.path.dirname(path))] = f.read()
+    return pages
+
+
+def scale_page(html_content, factor):
+    """The page with its cards repeated `factor` times, each copy under its own project name"""
+    if factor == 1:
+        return html_content
+    soup = BeautifulSoup(html_content, 'html.parser')
+    cards = soup.find_all('div', class_=CARD_CLASS_RE)
+    for k in range(1, factor):
+        for card in cards:
+            clone = copy.copy(card)
+            name = clone.find(class_=NAME_CLASS_RE)
+            if name is not None:
+                name.string = f"{name.get_text(strip=True)} {k}"
+            cards[-1].parent.append(clone)
+    return str(soup)
+
+
+def measure(fn, setup=None, repeat=5):
+    """(latencies in seconds, peak traced bytes) of `fn(setup())`, setup not timed"""
+    setup = setup or (lambda: None)
+    fn(setup())  # warm-up
+    latencies = []
+    for _ in range(repeat):
+        arg = setup()
+        started = time.perf_counter()
+        fn(arg)
+        latencies.append(time.perf_counter() - started)
+    # Memory is traced on a separate run so the tracing overhead does not skew the timings
+    arg = setup()
+    tracemalloc.start()
+    try:
+        fn(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return latencies, peak
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, round(q * (len(values) - 1)))]
+
+
+def cases(html_content):
+    """(name, items, fn, setup) of every benchmarked step on one page"""
+    projects = list(parse_projects(html_content))
+    kept = filter_sold_out(copy.deepcopy(projects))
+    prices = [c['price'] for p in kept for c in p['configurations']]
+    possessions = [p.get('possession_date', '') for p in kept]
+    normalized = records.normalize_projects(copy.deepcopy(kept))
+    n_cards = len(projects)
+
+    steps = []
+    for parser in PARSERS:
+        steps.append((f"parse_projects[{parser}]", n_cards,
+                      lambda _, parser=parser: list(parse_projects(html_content, parser)), None))
+    steps += [
+        ("filter_sold_out", n_cards, filter_sold_out, lambda: copy.deepcopy(projects)),
+        ("parse_price", len(prices), lambda _: [records.parse_price(p) for p in prices], None),
+        ("parse_possession_date", len(possessions),
+         lambda _: [records.is_ready_to_move(p) or records.parse_possession_month(p) for p in possessions], None),
+        ("filter_projects", len(prices), lambda _: filter_projects(normalized), None),
+    ]
+    return steps
+
+
+def filter_projects(projects):
+    """What the app does for a fresh load without a search: build the table, mask, sort, group the first page"""
+    table = config_table.build_config_table(projects)
+    mask = config_table.filter_mask(table, *APP_FILTERS)
+    summary = config_table.sort_projects(config_table.summarize_projects(table, mask), 'Price (low to high)')
+    return config_table.group_projects(table, mask, projects, order=summary.index[:25].tolist())
+
+
+def run(scales, repeat, log=print):
+    pages = fixture_pages()
+    if not pages:
+        raise SystemExit(f"No listing pages under {FIXTURES}")
+    results = {}
+    log(f"{'Case':<46} {'Items':>7} {'Items/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'Peak KiB':>9}")
+    for location, html_content in pages.items():
+        for scale in scales:
+            page = scale_page(html_content, scale)
+            for name, items, fn, setup in cases(page):
+                latencies, peak = measure(fn, setup, repeat)
+                p50, p95 = percentile(latencies, 0.5), percentile(latencies, 0.95)
+                key = f"{location} x{scale} {name}"
+                results[key] = {
+                    'items': items,
+                    'throughput': items / p50 if p50 else None,
+                    'p50': p50,
+                    'p95': p95,
+                    'peak_bytes': peak,
+                }
+                throughput = results[key]['throughput'] or 0
+                log(f"{key:<46} {items:>7} {throughput:>10.0f} {p50 * 1000:>9.3f} {p95 * 1000:>9.3f} {peak / 1024:>9.1f}")
+    return results
+
+
+def regressions(results, baseline, tolerance, min_seconds=0.001):
+    """Messages for the cases slower or hungrier than `baseline` by more than `tolerance`.
+
+    Latencies below `min_seconds` in both runs are too noisy to compare.
+    """
+    failures = []
+    for key, base in baseline.items():
+        current = results.get(key)
+        if current is None:
+            continue
+        if max(current['p50'], base['p50']) >= min_seconds and current['p50'] > base['p50'] * (1 + tolerance):
+            failures.append(f"{key}: p50 {current['p50'] * 1000:.2f} ms vs {base['p50'] * 1000:.2f} ms baseline")
+        if current['peak_bytes'] > base['peak_bytes'] * (1 + tolerance):
+            failures.append(f"{key}: peak {current['peak_bytes'] / 1024:.0f} KiB vs {base['peak_bytes'] / 1024:.0f} KiB baseline")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="Card count multipliers")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write the results as the new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="Fail when results regress against this baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown/growth vs the baseline (default: 0.25)")
+    args = parser.parse_args()
+
+    results = run(args.scales, args.repeat)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            failures = regressions(results, json.load(f), args.tolerance)
+        if failures:
+            print(f"\n{len(failures)} regression(s) against {args.baseline}:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
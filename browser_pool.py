@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: profiles are only guarded within this process
+    fcntl = None
+
+
+class BrowserPool:
+    """Bounded pool of reusable browser sessions.
+
+    Drivers are created lazily by `factory`, handed out one at a time and put
+    back after use. A driver is recycled (quit and replaced) once it has served
+    `max_uses` scrapes, sat idle for longer than `max_idle` seconds or fails
+    its health check.
+    """
+
+    def __init__(self, factory, max_size=2, max_uses=25, max_idle=600):
+        self.factory = factory
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.max_idle = max_idle
+        self._idle = []  # list of (driver, uses, last_used)
+        self._in_use = {}  # id(driver) -> uses
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout=None):
+        """Take a healthy driver from the pool, creating one if there is room"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+
+                # Reuse the most recently returned driver if it is still fit
+                while self._idle:
+                    driver, uses, last_used = self._idle.pop()
+                    if time.monotonic() - last_used > self.max_idle or not self._is_healthy(driver):
+                        self._discard(driver)
+                        continue
+                    self._in_use[id(driver)] = uses
+                    return driver
+
+                if self._created < self.max_size:
+                    self._created += 1
+                    break
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a free browser")
+                self._cond.wait(remaining)
+
+        # Start the browser outside the lock, it takes a few seconds
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._in_use[id(driver)] = 0
+        return driver
+
+    def release(self, driver, broken=False):
+        """Return a driver to the pool, or drop it if broken or worn out"""
+        with self._cond:
+            uses = self._in_use.pop(id(driver), 0) + 1
+            if broken or self._closed or uses >= self.max_uses:
+                self._discard(driver)
+            else:
+                self._idle.append((driver, uses, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def session(self, timeout=None):
+        """Context manager yielding a pooled driver"""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except Exception:
+            self.release(driver, broken=True)
+            raise
+        else:
+            self.release(driver)
+
+    def warm(self, count=1):
+        """Pre-start up to `count` browsers so the first scrape skips the cold start"""
+        drivers = []
+        try:
+            for _ in range(min(count, self.max_size)):
+                drivers.append(self.acquire(timeout=0))
+        except TimeoutError:
+            pass
+        for driver in drivers:
+            self.release(driver)
+
+    def stats(self):
+        """Return a snapshot of pool usage"""
+        with self._cond:
+            return {
+                'size': self._created,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'max_size': self.max_size,
+            }
+
+    def close(self):
+        """Quit every idle driver and refuse new acquisitions"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                driver, _, _ = self._idle.pop()
+                self._discard(driver)
+            self._cond.notify_all()
+
+    def _is_healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        # Caller holds the lock
+        self._created -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+class ProfileSlots:
+    """Numbered browser profile directories under `root`, one per running browser.
+
+    Profiles, and the disk cache inside them, are kept between runs so repeat
+    scrapes load static assets from cache. A slot is locked (flock) while its
+    browser runs, so two processes never open the same profile.
+    """
+
+    def __init__(self, root, max_slots=16):
+        self.root = root
+        self.max_slots = max_slots
+        self._held = {}  # slot -> open lock file
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Lock a free slot and return (slot, profile directory)"""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            for slot in range(self.max_slots):
+                if slot in self._held:
+                    continue
+                lock_file = open(os.path.join(self.root, f"profile-{slot}.lock"), "w")
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        lock_file.close()
+                        continue
+                self._held[slot] = lock_file
+                return slot, os.path.join(self.root, f"profile-{slot}")
+        raise RuntimeError(f"All {self.max_slots} browser profiles under {self.root} are in use")
+
+    def release(self, slot):
+        with self._lock:
+            lock_file = self._held.pop(slot, None)
+        if lock_file is not None:
+            lock_file.close()
@@ -0,0 +1,105 @@
+import hashlib
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+
+
+def project_key(project):
+    """Identity of a project across scrapes"""
+    return (project.get('project_name'), project.get('builder_name'))
+
+
+def config_key(config):
+    return (config.get('bhk', ''), config.get('size', ''), config.get('price', ''))
+
+
+def fingerprint(project):
+    """Hash of everything shown on a project card, order of configurations ignored"""
+    payload = [
+        project.get('project_name'),
+        project.get('builder_name'),
+        project.get('possession_date'),
+        sorted(config_key(c) for c in project.get('configurations', [])),
+    ]
+    return hashlib.sha1(json.dumps(payload, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+@dataclass(slots=True)
+class ProjectChange:
+    """A project present in both snapshots whose card changed"""
+
+    old: dict
+    new: dict
+    added_configs: list = field(default_factory=list)
+    removed_configs: list = field(default_factory=list)
+
+    @property
+    def possession_changed(self):
+        return self.old.get('possession_date') != self.new.get('possession_date')
+
+
+@dataclass(slots=True)
+class Delta:
+    """Difference between the stored snapshot of a location and a new scrape"""
+
+    added: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    unchanged: int = 0
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def config_counts(self):
+        """(added, removed) configuration counts across all project changes"""
+        added = sum(len(p.get('configurations', [])) for p in self.added)
+        removed = sum(len(p.get('configurations', [])) for p in self.removed)
+        for change in self.changed:
+            added += len(change.added_configs)
+            removed += len(change.removed_configs)
+        return added, removed
+
+    def summary(self):
+        configs_added, configs_removed = self.config_counts()
+        return (f"{len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed, "
+                f"{self.unchanged} unchanged projects; {configs_added} configurations added, {configs_removed} removed")
+
+
+def diff_configs(old_configs, new_configs):
+    """(added, removed) configurations, compared as (bhk, size, price) multisets"""
+    old_counts = Counter(config_key(c) for c in old_configs)
+    new_counts = Counter(config_key(c) for c in new_configs)
+    added, removed = [], []
+    for config in new_configs:
+        key = config_key(config)
+        if old_counts[key] > 0:
+            old_counts[key] -= 1
+        else:
+            added.append(config)
+    for config in old_configs:
+        key = config_key(config)
+        if new_counts[key] > 0:
+            new_counts[key] -= 1
+        else:
+            removed.append(config)
+    return added, removed
+
+
+def diff_projects(old_projects, new_projects):
+    """Compare two snapshots of a location project by project"""
+    old_by_key = {project_key(p): p for p in old_projects}
+    new_keys = set()
+    delta = Delta()
+    for project in new_projects:
+        key = project_key(project)
+        new_keys.add(key)
+        old = old_by_key.get(key)
+        if old is None:
+            delta.added.append(project)
+        elif fingerprint(old) != fingerprint(project):
+            added, removed = diff_configs(old.get('configurations', []), project.get('configurations', []))
+            delta.changed.append(ProjectChange(old, project, added, removed))
+        else:
+            delta.unchanged += 1
+    delta.removed = [p for key, p in old_by_key.items() if key not in new_keys]
+    return delta
@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+
+import records
+
+COLUMNS = ['location', 'project_idx', 'config_idx', 'project_name', 'builder_name', 'possession_date',
+           'possession_month', 'ready_to_move', 'bhk', 'size', 'price', 'price_inr', 'carpet_sqft', 'bhk_count']
+
+
+def build_config_table(projects, location=None):
+    """Flatten projects into one row per configuration.
+
+    `project_idx`/`config_idx` point back into `projects` so filtered rows can
+    be grouped back into project dicts. Expects the numeric fields from
+    records.py; older dicts should go through records.normalize_projects first.
+    """
+    rows = {name: [] for name in COLUMNS}
+    for i, project in enumerate(projects):
+        for j, config in enumerate(project.get('configurations', [])):
+            rows['location'].append(location)
+            rows['project_idx'].append(i)
+            rows['config_idx'].append(j)
+            rows['project_name'].append(project.get('project_name') or '')
+            rows['builder_name'].append(project.get('builder_name') or '')
+            rows['possession_date'].append(project.get('possession_date'))
+            rows['possession_month'].append(project.get('possession_month'))
+            rows['ready_to_move'].append(bool(project.get('ready_to_move')))
+            rows['bhk'].append(config.get('bhk', ''))
+            rows['size'].append(config.get('size', ''))
+            rows['price'].append(config.get('price', ''))
+            rows['price_inr'].append(config['price_inr'])
+            rows['carpet_sqft'].append(config['carpet_sqft'])
+            rows['bhk_count'].append(config['bhk_count'])
+
+    table = pd.DataFrame(rows, columns=COLUMNS)
+    table = table.astype({
+        'project_idx': 'int64',
+        'config_idx': 'int64',
+        'possession_month': 'float64',
+        'ready_to_move': 'bool',
+        'price_inr': 'int64',
+        'carpet_sqft': 'float64',
+        'bhk_count': 'float64',
+    })
+    table['bhk'] = table['bhk'].astype('category')
+    return table
+
+
+def filter_mask(table, price_range, bhk_filter, possession_range, area_range):
+    """Boolean mask of the configurations matching every filter"""
+    mask = table['price_inr'].between(price_range[0], price_range[1]).to_numpy()
+
+    if bhk_filter:
+        mask = mask & table['bhk'].isin(bhk_filter).to_numpy()
+
+    # Configurations without a parsed area are not filtered on it
+    area = table['carpet_sqft'].to_numpy()
+    mask = mask & (np.isnan(area) | ((area >= area_range[0]) & (area <= area_range[1])))
+
+    # "Ready to Move" counts as the current month; unknown dates are not filtered
+    lo = possession_range[0].year * 100 + possession_range[0].month
+    hi = possession_range[1].year * 100 + possession_range[1].month
+    possession = np.where(table['ready_to_move'].to_numpy(), records.current_month(),
+                          table['possession_month'].to_numpy())
+    mask = mask & (np.isnan(possession) | (possession == 0) | ((possession >= lo) & (possession <= hi)))
+    return mask
+
+
+def group_projects(table, mask, projects, order=None):
+    """Rebuild project dicts holding only the configurations selected by `mask`.
+
+    Projects come back in scrape order, or in the order of the project
+    indexes in `order` (e.g. one sorted page of `summarize_projects`); only
+    the projects in `order` are then built.
+    """
+    if order is not None:
+        mask = mask & table['project_idx'].isin(order).to_numpy()
+    project_ids = table['project_idx'].to_numpy()[mask].tolist()
+    config_ids = table['config_idx'].to_numpy()[mask].tolist()
+    grouped = {}
+    current_idx = None
+    for project_idx, config_idx in zip(project_ids, config_ids):
+        if project_idx != current_idx:
+            current_idx = project_idx
+            configurations = projects[project_idx]['configurations']
+            current = projects[project_idx].copy()
+            current['configurations'] = []
+            grouped[project_idx] = current
+        current['configurations'].append(configurations[config_idx])
+    if order is None:
+        return list(grouped.values())
+    return [grouped[i] for i in order if i in grouped]
+
+
+# Sort options for the results: label -> (summary column, ascending)
+SORT_KEYS = {
+    'Relevance': ('relevance', False),
+    'Price (low to high)': ('min_price', True),
+    'Price (high to low)': ('min_price', False),
+    'Carpet area (largest first)': ('max_area', False),
+    'Possession (earliest first)': ('possession', True),
+    'Name (A-Z)': ('project_name', True),
+}
+
+
+def summarize_projects(table, mask):
+    """One row per project with a matching configuration, indexed by project_idx.
+
+    Holds what sorting and paging need (cheapest price, largest area,
+    possession month, matching configuration count) without building dicts.
+    Relies on build_config_table keeping each project's rows together.
+    """
+    selected = np.flatnonzero(mask)
+    project_ids = table['project_idx'].to_numpy()[selected]
+    # Each project's matching rows are one run; reduce every run in a single pass
+    starts = np.flatnonzero(np.r_[True, project_ids[1:] != project_ids[:-1]]) if len(selected) else selected
+    first = selected[starts]
+    ready = table['ready_to_move'].to_numpy()[first]
+    return pd.DataFrame({
+        'project_name': table['project_name'].iloc[first].array,
+        'min_price': np.minimum.reduceat(table['price_inr'].to_numpy()[selected], starts),
+        # fmax skips NaN, so a project without any parsed area gets NaN
+        'max_area': np.fmax.reduceat(table['carpet_sqft'].to_numpy()[selected], starts),
+        'possession': np.where(ready, records.current_month(), table['possession_month'].to_numpy()[first]),
+        'ready': ready,
+        'configs': np.diff(np.r_[starts, len(selected)]),
+    }, index=pd.Index(project_ids[starts], name='project_idx'))
+
+
+def sort_projects(summary, sort_key):
+    column, ascending = SORT_KEYS[sort_key]
+    if column not in summary:
+        # e.g. relevance without a search, keep scrape order
+        return summary
+    if column == 'project_name':
+        return summary.sort_values(column, ascending=ascending, kind='stable', key=lambda s: s.str.lower())
+    return summary.sort_values(column, ascending=ascending, na_position='last', kind='stable')
+
+
+def config_rows(table, mask, order):
+    """Flat table of the selected configurations, projects in `order`"""
+    selected = mask & table['project_idx'].isin(order).to_numpy()
+    rows = table.loc[selected]
+    rank = pd.Series(range(len(order)), index=order)
+    rows = rows.assign(_rank=rows['project_idx'].map(rank)).sort_values(['_rank', 'config_idx'], kind='stable')
+    return rows
+
+
+def distribution(values):
+    """Min, max and 5/25/50/75/95th percentiles of `values`, NaNs left out; None if there are none"""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    p5, p25, p50, p75, p95 = np.percentile(values, [5, 25, 50, 75, 95])
+    return {'min': float(values.min()), 'max': float(values.max()), 'p5': float(p5), 'p25': float(p25),
+            'p50': float(p50), 'p75': float(p75), 'p95': float(p95)}
+
+
+def dataset_stats(table):
+    """Facets and aggregates of a whole dataset, computed once per load.
+
+    Holds the BHK labels with their configuration counts (ordered by bedroom
+    count), price and area distributions (min/max/percentiles; unparsed
+    prices and areas left out) and a histogram of projects per possession year.
+    """
+    bhk = table.groupby('bhk', observed=True).agg(configs=('bhk', 'size'), rooms=('bhk_count', 'min'))
+    bhk = bhk.sort_values(['rooms', 'configs'], ascending=[True, False], na_position='last', kind='stable')
+    prices = table['price_inr'].to_numpy(dtype='float64')
+    projects = table.drop_duplicates('project_idx')
+    months = np.where(projects['ready_to_move'].to_numpy(), records.current_month(),
+                      projects['possession_month'].to_numpy())
+    years = pd.Series(months[~np.isnan(months)] // 100, dtype='int64').value_counts().sort_index()
+    return {
+        'projects': int(table['project_idx'].nunique()),
+        'configs': len(table),
+        'bhk': {str(label): int(row.configs) for label, row in bhk.iterrows()},
+        'price': distribution(prices[prices > 0]),
+        'area': distribution(table['carpet_sqft'].to_numpy()),
+        'possession_years': {int(year): int(count) for year, count in years.items()},
+        'unknown_possession': int(np.isnan(months).sum()),
+    }
+
+
+def bhk_mask(table, bhk_filter):
+    """Mask of the configurations whose BHK label is selected; everything if none is"""
+    if not bhk_filter:
+        return np.ones(len(table), dtype=bool)
+    return table['bhk'].isin(bhk_filter).to_numpy()
+
+
+def facet_counts(table, mask):
+    """Matching configurations per BHK label under `mask`, for live counts next to each option"""
+    counts = table.loc[mask, 'bhk'].value_counts()
+    return {str(label): int(count) for label, count in counts.items() if count}
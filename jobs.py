@@ -0,0 +1,144 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """A background scrape job.
+
+    `log` collects its output as progress and `add_result` the items it has
+    produced so far, so callers can show partial results while it runs.
+    """
+
+    def __init__(self, job_id, location):
+        self.id = job_id
+        self.location = location
+        self.state = QUEUED
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self.error_type = None
+        self.lines = []
+        self.results = []
+        self._lock = threading.Lock()
+
+    def log(self, *args):
+        with self._lock:
+            self.lines.append(" ".join(str(a) for a in args))
+
+    def add_result(self, item):
+        with self._lock:
+            self.results.append(item)
+
+    def partial_results(self):
+        with self._lock:
+            return list(self.results)
+
+    @property
+    def active(self):
+        return self.state in (QUEUED, RUNNING)
+
+    def snapshot(self):
+        """Status of the job as a plain dict, safe to read from any thread"""
+        with self._lock:
+            lines = list(self.lines)
+        end = self.finished_at or time.time()
+        return {
+            'id': self.id,
+            'location': self.location,
+            'state': self.state,
+            'error': self.error,
+            'error_type': self.error_type,
+            'elapsed': round(end - (self.started_at or end), 1),
+            'progress': next((line.strip() for line in reversed(lines) if line.strip()), ""),
+            'output': "\n".join(lines),
+            'result_count': len(self.results),
+        }
+
+
+class JobScheduler:
+    """Runs scrape jobs on a bounded thread pool so callers never block on them.
+
+    `submit` returns a job id straight away; `status` reports its progress.
+    Submitting a location that already has a queued or running job returns
+    that job instead of starting another one. Only the `max_history` most
+    recent jobs are kept.
+    """
+
+    def __init__(self, max_workers=2, max_history=100):
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape-job")
+        self._jobs = OrderedDict()  # id -> Job
+        self._active = {}  # location -> Job
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, location, fn):
+        """Queue `fn(job)` for `location` and return the job id"""
+        with self._lock:
+            job = self._active.get(location)
+            if job is not None:
+                return job.id
+            job = Job(str(next(self._ids)), location)
+            self._jobs[job.id] = job
+            self._active[location] = job
+            while len(self._jobs) > self.max_history:
+                oldest = next(iter(self._jobs.values()))
+                if oldest.active:
+                    break
+                self._jobs.popitem(last=False)
+        self._executor.submit(self._run, job, fn)
+        return job.id
+
+    def status(self, job_id):
+        """Snapshot dict of a job, None if unknown or already pruned"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.snapshot() if job else None
+
+    def partial_results(self, job_id):
+        """Items produced so far by a job, empty if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.partial_results() if job else []
+
+    def active_job(self, location):
+        """Id of the queued or running job for `location`, if any"""
+        with self._lock:
+            job = self._active.get(location)
+            return job.id if job else None
+
+    def jobs(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.snapshot() for job in jobs]
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job, fn):
+        job.state = RUNNING
+        job.started_at = time.time()
+        try:
+            fn(job)
+            job.state = DONE
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job.error_type = type(e).__name__
+            job.state = FAILED
+        finally:
+            job.finished_at = time.time()
+            if job.state == DONE:
+                # The finished data lives in the caller's cache, keep the history light
+                job.results = []
+            with self._lock:
+                if self._active.get(job.location) is job:
+                    del self._active[job.location]
@@ -1,182 +1,977 @@
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import (InvalidSessionIdException, NoSuchWindowException, TimeoutException,
+                                        WebDriverException)
 from bs4 import BeautifulSoup
+import requests
+from requests.adapters import HTTPAdapter
+import os
+import gzip
+import io
 import time
 import json
 import re
 import argparse
+import html
+from urllib.parse import urljoin, urlparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
+from functools import partial
 
-def parse_projects(html_content):
-    """Parse the HTML content and extract project details"""
+from browser_pool import BrowserPool, ProfileSlots
+from records import Project
+import metrics
+from resilience import FetchError, NoResultsError, RetryPolicy, ScrapeError, get_circuit_breaker, get_rate_limiter
+import snapshot
+import store
+
+try:
+    import lxml.etree
+except ImportError:  # optional fast parser, html.parser is used without it
+    lxml = None
+
+
+# Card selectors, compiled once instead of on every card
+CARD_CLASS_RE = re.compile(r'bg-white.*border.*rounded-sm')
+NAME_CLASS_RE = re.compile(r'.*font-bold.*text-primary.*')
+BUILDER_HREF_RE = re.compile(r'/builder/')
+CONFIG_CLASS_RE = re.compile(r'text-\[#234e70\].*list-fx-features')
+POSSESSION_CLASS = 'text-[#0E8744]'
+CONFIG_ITEM_CLASS = 'text-xs'
+
+
+def _build_project(name, builder, possession, config_rows):
+    """Assemble a project dict from the text pulled out of one card"""
+    project_data = {}
+    if name is not None:
+        project_data['project_name'] = name
+    if builder is not None:
+        project_data['builder_name'] = builder
+    if possession is not None:
+        project_data['possession_date'] = possession
+
+    # Extract flat configurations (BHK, size, price)
+    configurations = []
+    for items in config_rows:
+        if len(items) >= 3:
+            configurations.append({'bhk': items[0], 'size': items[1], 'price': items[2]})
+    project_data['configurations'] = configurations
+    return project_data
+
+
+def _find_cards_bs4(html_content):
     soup = BeautifulSoup(html_content, 'html.parser')
-    projects = []
-    
-    # Find all project cards
-    project_cards = soup.find_all('div', class_=re.compile(r'bg-white.*border.*rounded-sm'))
-    
-    print(f"Found {len(project_cards)} project cards")
-    
-    for card in project_cards:
+    return soup.find_all('div', class_=CARD_CLASS_RE)
+
+
+def _extract_card_bs4(card):
+    """Return (name, builder, possession, config rows) for a BeautifulSoup card"""
+    name_elem = card.find('h3', class_=NAME_CLASS_RE)
+    builder = None
+    builder_elem = card.find('a', href=BUILDER_HREF_RE)
+    if builder_elem:
+        builder_name = builder_elem.find('p')
+        if builder_name:
+            builder = builder_name.text.strip()
+    possession_elem = card.find('span', class_=POSSESSION_CLASS)
+    config_rows = [
+        [item.text.strip() for item in config_div.find_all('div', class_=CONFIG_ITEM_CLASS)]
+        for config_div in card.find_all('div', class_=CONFIG_CLASS_RE)
+    ]
+    return (name_elem.text.strip() if name_elem else None, builder,
+            possession_elem.text.strip() if possession_elem else None, config_rows)
+
+
+def _class_matches(class_attr, pattern):
+    # Same rule as BeautifulSoup: match any single class or the whole attribute
+    if not class_attr:
+        return False
+    classes = class_attr.split()
+    if isinstance(pattern, str):
+        return pattern in classes or pattern == " ".join(classes)
+    return any(pattern.search(c) for c in classes) or bool(pattern.search(" ".join(classes)))
+
+
+def _first(elements, predicate=None):
+    return next((e for e in elements if predicate is None or predicate(e)), None)
+
+
+def _text(element):
+    return _STRING_XPATH(element)
+
+
+def _find_cards_lxml(html_content):
+    """Yield the cards while the page is being parsed.
+
+    Cards nested in a card are yielded after it, in document order, as
+    BeautifulSoup's find_all does. Each outermost card is cleared once the
+    caller is done with it and its nested cards, together with the markup
+    before it, so the tree never holds more than about one card.
+    """
+    if not html_content or not html_content.strip():
+        return
+    events = lxml.etree.iterparse(io.BytesIO(html_content.encode('utf-8')), events=('start', 'end'), tag='div',
+                                  html=True, encoding='utf-8')
+    depth = 0  # cards currently open
+    for event, element in events:
+        if not _class_matches(element.get('class'), CARD_CLASS_RE):
+            continue
+        if event == 'start':
+            depth += 1
+            continue
+        depth -= 1
+        if depth:
+            # Nested card: yielded with its outermost card, whose content it still is
+            continue
+        yield element
+        for nested in element.iterdescendants('div'):
+            if _class_matches(nested.get('class'), CARD_CLASS_RE):
+                yield nested
+        element.clear(keep_tail=True)
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+
+def _extract_card_lxml(card):
+    """Return (name, builder, possession, config rows) for an lxml card"""
+    name_elem = _first(card.iterdescendants('h3'), lambda e: _class_matches(e.get('class'), NAME_CLASS_RE))
+    builder = None
+    builder_elem = _first(card.iterdescendants('a'), lambda e: BUILDER_HREF_RE.search(e.get('href') or ''))
+    if builder_elem is not None:
+        builder_name = _first(builder_elem.iterdescendants('p'))
+        if builder_name is not None:
+            builder = _text(builder_name).strip()
+    possession_elem = _first(card.iterdescendants('span'), lambda e: _class_matches(e.get('class'), POSSESSION_CLASS))
+    config_rows = [
+        [_text(item).strip() for item in config_div.iterdescendants('div')
+         if _class_matches(item.get('class'), CONFIG_ITEM_CLASS)]
+        for config_div in card.iterdescendants('div')
+        if _class_matches(config_div.get('class'), CONFIG_CLASS_RE)
+    ]
+    return (_text(name_elem).strip() if name_elem is not None else None, builder,
+            _text(possession_elem).strip() if possession_elem is not None else None, config_rows)
+
+
+# Parser backends: name -> (find the cards in a page, extract one card)
+PARSERS = {'html.parser': (_find_cards_bs4, _extract_card_bs4)}
+if lxml is not None:
+    _STRING_XPATH = lxml.etree.XPath('string()')
+    PARSERS['lxml'] = (_find_cards_lxml, _extract_card_lxml)
+DEFAULT_PARSER = 'lxml' if 'lxml' in PARSERS else 'html.parser'
+
+
+def parse_projects(html_content, parser=None, log=None):
+    """Parse the HTML content and yield project details card by card.
+
+    `parser` picks the backend ("lxml" or "html.parser"); both produce the
+    same projects, lxml is used when installed and parses the page
+    incrementally instead of building the whole tree. Pass `log` to see card
+    counts and per-card errors.
+    """
+    find_cards, extract_card = PARSERS[parser or DEFAULT_PARSER]
+
+    card_count = 0
+    for card in find_cards(html_content):
+        card_count += 1
         try:
-            project_data = {}
-            
-            # Extract Project Name
-            project_name_elem = card.find('h3', class_=re.compile(r'.*font-bold.*text-primary.*'))
-            print(f"Project Name Element: {project_name_elem}")
-            if project_name_elem:
-                project_data['project_name'] = project_name_elem.text.strip()
-            
-            # Extract Builder Name
-            builder_elem = card.find('a', href=re.compile(r'/builder/'))
-            if builder_elem:
-                builder_name = builder_elem.find('p')
-                if builder_name:
-                    project_data['builder_name'] = builder_name.text.strip()
-            
-            # Extract Possession Date
-            possession_elem = card.find('span', class_='text-[#0E8744]')
-            if possession_elem:
-                possession_text = possession_elem.text.strip()
-                project_data['possession_date'] = possession_text
-            
-            # Extract flat configurations (BHK, size, price)
-            configurations = []
-            config_divs = card.find_all('div', class_=re.compile(r'text-\[#234e70\].*list-fx-features'))
-            
-            for config_div in config_divs:
-                config = {}
-                items = config_div.find_all('div', class_='text-xs')
-                
-                if len(items) >= 3:
-                    # BHK configuration
-                    config['bhk'] = items[0].text.strip()
-                    # Size
-                    config['size'] = items[1].text.strip()
-                    # Price
-                    config['price'] = items[2].text.strip()
-                    
-                    configurations.append(config)
-            
-            project_data['configurations'] = configurations
-            
-            # Only add projects that have at least a name
-            if 'project_name' in project_data:
-                projects.append(project_data)
-                
+            project_data = _build_project(*extract_card(card))
+
         except Exception as e:
-            print(f"Error parsing a project card: {e}")
+            if log:
+                log(f"Error parsing a project card: {e}")
             continue
-    
-    return projects
+
+        # Only yield projects that have at least a name
+        if 'project_name' in project_data:
+            yield project_data
+
+    if log:
+        log(f"Found {card_count} project cards")
 
 
-def main(location, min_price, max_price, config):
-    # Build the full URL with parameters
-    base_url = "https://housiey.com/in/pune/"
+BASE_URL = "https://housiey.com/in/pune/"
+COMMON_LOCATIONS = ['wakad', 'tathawade', 'hinjewadi', 'baner', 'pimple-saudagar', 'balewadi', 'punawale', 'chinchwad', 'moshi', 'ravet', 'kharadi', 'akurdi', 'bavdhan']
+# CSS equivalents of the card selectors in parse_projects, used to wait on the live DOM
+CARD_CSS = 'div[class*="bg-white"][class*="border"][class*="rounded-sm"]'
+NEXT_LINK_RE = re.compile(r'<a[^>]*\brel=["\']next["\'][^>]*\bhref=["\']([^"\']+)["\']', re.IGNORECASE)
+LOAD_MORE_XPATH = ("//button[contains(., 'Load More') or contains(., 'View More') or contains(., 'Show More')]"
+                   " | //a[@rel='next']")
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+# Responses worth retrying: rate limited or a temporary server failure
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Lean mode: requests parse_projects never needs (images, fonts, media, map tiles, analytics, ads),
+# as Network.setBlockedURLs wildcard patterns
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm",
+    "*maps.googleapis.com*", "*maps.gstatic.com*", "*tile.openstreetmap.org*", "*api.mapbox.com*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*connect.facebook.net*", "*facebook.com/tr*", "*hotjar.com*", "*clarity.ms*",
+]
+# Browser features a scrape never uses, switched off in lean mode
+LEAN_CHROME_ARGS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--disable-features=Translate,OptimizationHints,MediaRouter",
+]
+# Profiles (with their disk cache) reused by lean browsers across scrapes and runs
+CHROME_PROFILE_DIR = os.environ.get("CHROME_PROFILE_DIR",
+                                    os.path.join(os.path.expanduser("~"), ".cache", "prop_search", "chrome"))
+DISK_CACHE_SIZE = 200 * 1024 * 1024
+PROFILES = ProfileSlots(CHROME_PROFILE_DIR)
+
+
+def build_url(location, min_price, max_price, config, base_url=BASE_URL, map_view=True):
+    """Build the housiey listing URL for a location and price/config filters"""
     location = location.lower().replace(" ", "-")  # Ensure location is formatted correctly for URL
-    min_price = min_price
-    max_price = max_price
-    config = config
-    params = f"?isMapView=true&config={config}&min={min_price}&max={max_price}&downPayment=&availability_status=1"
-    full_url = base_url + location + params
-    
-    # Set up Chrome options
+    params = f"?isMapView={str(map_view).lower()}&config={config}&min={min_price}&max={max_price}&downPayment=&availability_status=1"
+    return base_url + location + params
+
+
+def build_chrome_options(lean=False, profile_dir=None):
+    """Chrome options shared by one-off and pooled browsers"""
     chrome_options = Options()
     chrome_options.add_argument("--headless")  # Run in headless mode (no GUI)
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--ignore-certificate-errors")  # Handle SSL issues
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    
-    driver = None
+    chrome_options.add_argument(f"--user-agent={USER_AGENT}")
+    if lean:
+        for argument in LEAN_CHROME_ARGS:
+            chrome_options.add_argument(argument)
+        chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+        chrome_options.add_argument(f"--disk-cache-dir={os.path.join(profile_dir, 'cache')}")
+        chrome_options.add_argument(f"--disk-cache-size={DISK_CACHE_SIZE}")
+    return chrome_options
+
+
+class ProfiledChrome(webdriver.Chrome):
+    """Chrome running on a reusable profile slot, handed back when it quits"""
+
+    def __init__(self, slot, **kwargs):
+        self.profile_slot = slot
+        super().__init__(**kwargs)
+
+    def quit(self):
+        try:
+            super().quit()
+        finally:
+            PROFILES.release(self.profile_slot)
+
+
+def create_driver(lean=False):
+    """Start a new headless Chrome session.
+
+    A lean session runs on a reusable profile with a disk cache and blocks
+    BLOCKED_URLS through the DevTools protocol.
+    """
+    if not lean:
+        driver = webdriver.Chrome(options=build_chrome_options())
+        driver.set_page_load_timeout(60)
+        return driver
+
+    slot, profile_dir = PROFILES.acquire()
+    try:
+        driver = ProfiledChrome(slot, options=build_chrome_options(lean=True, profile_dir=profile_dir))
+    except Exception:
+        PROFILES.release(slot)
+        raise
+    driver.set_page_load_timeout(60)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    return driver
+
+
+# Transfer size and load time of the current document and everything it loaded
+PAGE_WEIGHT_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+return {
+    bytes: (nav ? nav.transferSize : 0) + resources.reduce((total, r) => total + (r.transferSize || 0), 0),
+    requests: resources.length + 1,
+    load_ms: nav && nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : null,
+};
+"""
+
+
+def record_page_weight(driver, trace):
+    """Add the bytes transferred, requests made and load time of the current page to `trace`"""
+    try:
+        weight = driver.execute_script(PAGE_WEIGHT_JS)
+    except Exception:
+        return
+    trace.count('bytes_transferred', int(weight.get('bytes') or 0))
+    trace.count('requests', int(weight.get('requests') or 0))
+    if weight.get('load_ms') is not None:
+        trace.count('page_load_ms', int(weight['load_ms']))
+
+
+def session_alive(driver):
+    """Whether the browser behind `driver` still answers"""
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+def count_cards(driver):
+    return len(driver.find_elements(By.CSS_SELECTOR, CARD_CSS))
+
+
+# Only the card subtrees leave the browser, not the whole rendered document
+# Outermost cards only: cards nested in a card already come with its outerHTML
+CARDS_HTML_JS = ("return Array.from(document.querySelectorAll(arguments[0]))"
+                 ".filter(card => !card.parentElement || !card.parentElement.closest(arguments[0]))"
+                 ".map(card => card.outerHTML).join('\\n');")
+
+
+def cards_html(driver):
+    """The rendered project cards as a small HTML document for parse_projects"""
+    return f"<html><body>{driver.execute_script(CARDS_HTML_JS, CARD_CSS)}</body></html>"
+
+
+def wait_for_stable_count(driver, settle=1.0, poll=0.25, timeout=15):
+    """Poll the card count until it has not changed for `settle` seconds"""
+    deadline = time.monotonic() + timeout
+    count = count_cards(driver)
+    stable_since = time.monotonic()
+    while time.monotonic() < deadline:
+        time.sleep(poll)
+        new_count = count_cards(driver)
+        now = time.monotonic()
+        if new_count != count:
+            count = new_count
+            stable_since = now
+        elif now - stable_since >= settle:
+            break
+    return count
+
+
+def wait_for_cards(driver, timeout=15, settle=1.0, poll=0.25):
+    """Wait for the first project card, then until the card count settles.
+
+    Returns the number of rendered cards, 0 if none showed up within `timeout`.
+    """
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll).until(lambda d: count_cards(d) > 0)
+    except TimeoutException:
+        return 0
+    return wait_for_stable_count(driver, settle, poll, timeout)
+
+
+def harvest_pages(driver, max_rounds=20, settle=1.0, poll=0.25, log=print, trace=None, navigate=None):
+    """Load every result by scrolling, clicking "load more" and following next-page links.
+
+    Lazy-loaded cards accumulate in the same DOM, so only paginated results
+    produce more than one page. Returns the cards of each page (see cards_html).
+    Next pages are loaded with `navigate(driver, url, log)`, e.g.
+    SeleniumFetcher.navigate to go through its rate limiter and retries.
+    """
+    trace = trace or metrics.ScrapeTrace()
+    navigate = navigate or (lambda driver, url, log: driver.get(url))
+    pages = []
+    visited = {driver.current_url}
+    count = count_cards(driver)
+    for _ in range(max_rounds):
+        # Infinite scroll: new cards are appended when we reach the bottom
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        with trace.span('wait'):
+            new_count = wait_for_stable_count(driver, settle, poll, timeout=settle * 4)
+        if new_count > count:
+            log(f"Scrolling loaded {new_count - count} more cards")
+            count = new_count
+            continue
+
+        more = driver.find_elements(By.XPATH, LOAD_MORE_XPATH)
+        if not more:
+            break
+        element = more[0]
+        href = element.get_attribute("href") if element.tag_name == "a" else None
+        if href:
+            # Real pagination: keep this page and move on to the next one
+            if href in visited:
+                break
+            visited.add(href)
+            with trace.span('page_source'):
+                pages.append(cards_html(driver))
+            record_page_weight(driver, trace)
+            log(f"Following next page {href}")
+            with trace.span('get', url=href):
+                navigate(driver, href, log)
+            with trace.span('wait'):
+                count = wait_for_cards(driver, settle=settle, poll=poll)
+            if not count:
+                break
+        else:
+            driver.execute_script("arguments[0].click();", element)
+            with trace.span('wait'):
+                new_count = wait_for_stable_count(driver, settle, poll, timeout=settle * 4)
+            if new_count <= count:
+                break
+            log(f"Load more added {new_count - count} cards")
+            count = new_count
+    with trace.span('page_source'):
+        pages.append(cards_html(driver))
+    record_page_weight(driver, trace)
+    return pages
+
+
+def dedupe_projects(projects, seen=None):
+    """Yield projects not seen before, e.g. skipping a card shown on two result pages"""
+    seen = set() if seen is None else seen
+    for project in projects:
+        key = (project.get('project_name'), project.get('builder_name'))
+        if key not in seen:
+            seen.add(key)
+            yield project
+
+
+def drop_sold_out(project):
+    """The project without its "Sold Out" configurations, None if none are left"""
+    if 'configurations' in project:
+        valid_configs = [config for config in project['configurations'] if 'Sold Out' not in config.get('bhk', '')]
+        if valid_configs:  # Only include project if it has valid configurations
+            project['configurations'] = valid_configs
+            return project
+    # elif project:  # Include projects without configurations field
+    #     return project
+    return None
+
+
+def filter_sold_out(projects):
+    """Drop "Sold Out" configurations, and projects left without any configuration"""
+    return [project for project in map(drop_sold_out, projects) if project is not None]
+
+
+def log_delta(delta, log=print):
+    """Print the projects and configurations that changed since the last scrape"""
+    log(f"\n{'='*50}")
+    log(f"Changes: {delta.summary()}")
+    for project in delta.added:
+        log(f"  + {project.get('project_name')} ({len(project.get('configurations', []))} configurations)")
+    for project in delta.removed:
+        log(f"  - {project.get('project_name')}")
+    for change in delta.changed:
+        log(f"  ~ {change.new.get('project_name')}")
+        if change.possession_changed:
+            log(f"      possession {change.old.get('possession_date', 'N/A')} -> {change.new.get('possession_date', 'N/A')}")
+        for config in change.added_configs:
+            log(f"      + {config.get('bhk', 'N/A')}: {config.get('size', 'N/A')} @ {config.get('price', 'N/A')}")
+        for config in change.removed_configs:
+            log(f"      - {config.get('bhk', 'N/A')}: {config.get('size', 'N/A')} @ {config.get('price', 'N/A')}")
+
+
+def save_projects(location, projects, export_json=True):
+    """Write the extracted projects to the snapshot file, and to projects_data_{location}.json with `export_json`.
+
+    Returns the paths written.
+    """
+    paths = [snapshot.save_projects(location, projects)]
+    if export_json:
+        filename = f"projects_data_{location}.json"
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(projects, f, indent=2, ensure_ascii=False)
+        paths.append(filename)
+    return paths
+
+
+def html_encoding(response):
+    """Charset of an HTML response: the Content-Type header's, else the <meta> tag's, else UTF-8.
+
+    requests falls back to ISO-8859-1 for text/html without a charset and
+    ignores <meta charset>, which garbles "₹" and other non-ASCII text.
+    """
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        return response.encoding
+    match = META_CHARSET_RE.search(response.content[:4096])
+    return match.group(1).decode('ascii') if match else 'utf-8'
+
+
+def retry_after(response, cap=60):
+    """Seconds asked for by a Retry-After header, 0 when absent or given as a date"""
     try:
-        print(f"Opening browser and navigating to {full_url}...")
-        
-        # Initialize the Chrome driver
-        driver = webdriver.Chrome(options=chrome_options)
-        
-        # Navigate to the URL
-        driver.get(full_url)
-        
-        # Wait for page to load (wait for body tag)
-        print("Waiting for page to load...")
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
-        
-        # Additional wait for dynamic content
-        time.sleep(3)
-        
-        # Get the page source (DOM content)
-        page_source = driver.page_source
-        
-        print(f"\n{'='*50}")
-        print(f"Page Title: {driver.title}")
-        print(f"Current URL: {driver.current_url}")
-        print(f"{'='*50}\n")
-        
-        # Print the DOM content
-        print("DOM Content (first 3000 characters):")
-        print(page_source[:3000])
-        
-        # Save full DOM to file
-        with open("page_source.html", "w", encoding="utf-8") as f:
-            f.write(page_source)
-        print(f"\n{'='*50}")
-        print("Full DOM content saved to page_source.html")
-        
-        # Parse projects from the HTML
-        print(f"\n{'='*50}")
-        print("Parsing project details...")
-        projects = parse_projects(page_source)
-        
-        # Display extracted projects
-        print(f"\n{'='*50}")
-        print(f"Extracted {len(projects)} projects:\n")
-        
-        # Save extracted data to JSON. Under configurations, if bhk value contains Sold Out, we will ignore that configuration and not include it in the JSON output. Also if after not considering such configurations if there are no configurations left for a project, we will ignore that project and not include it in the JSON output
-        # Filter out "Sold Out" configurations and projects without valid configurations
-        filtered_projects = []
-        for project in projects:
-            if 'configurations' in project:
-                valid_configs = [config for config in project['configurations'] if 'Sold Out' not in config.get('bhk', '')]
-                if valid_configs:  # Only include project if it has valid configurations
-                    project['configurations'] = valid_configs
-                    filtered_projects.append(project)
-            # elif project:  # Include projects without configurations field
-            #     filtered_projects.append(project)
-
-        for i, project in enumerate(filtered_projects, 1):
-            print(f"\nProject {i}:")
-            print(f"  Name: {project.get('project_name', 'N/A')}")
-            print(f"  Builder: {project.get('builder_name', 'N/A')}")
-            print(f"  Possession: {project.get('possession_date', 'N/A')}")
-            
-            if project.get('configurations'):
-                print(f"  Configurations:")
-                for config in project['configurations']:
-                    print(f"    - {config.get('bhk', 'N/A')}: {config.get('size', 'N/A')} @ {config.get('price', 'N/A')}")
+        return min(cap, max(0, int(response.headers.get('Retry-After', 0))))
+    except ValueError:
+        return 0
+
+
+class HttpFetcher:
+    """Plain HTTP fetch of the server-rendered listing, no browser involved.
+
+    Uses one pooled keep-alive session (gzip is negotiated by requests).
+    Every request waits for the per-host rate limiter, and connection errors,
+    timeouts and 429/5xx responses are retried with jittered exponential
+    backoff (honouring Retry-After); a request that still fails raises
+    FetchError. Follows rel=next links in the returned HTML, up to `max_pages`.
+    """
+
+    name = "http"
+
+    def __init__(self, timeout=15, retries=3, pool_size=8, max_pages=10, retry=None, limiter=None):
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.retry = retry or RetryPolicy(attempts=retries + 1)
+        self.limiter = limiter or get_rate_limiter()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
+            "Accept-Encoding": "gzip, deflate",
+        })
+
+    def fetch(self, url, log=print, trace=None):
+        """Yield each result page as soon as it has been downloaded"""
+        trace = trace or metrics.ScrapeTrace()
+        visited = set()
+        while url and url not in visited and len(visited) < self.max_pages:
+            visited.add(url)
+            log(f"GET {url}")
+            with trace.span('get', url=url):
+                response = self.get(url, log)
+            # Content-Length is the compressed size when the server sends one
+            trace.count('bytes_transferred', int(response.headers.get('Content-Length') or len(response.content)))
+            trace.count('requests')
+            response.encoding = html_encoding(response)
+            yield response.text
+            next_link = NEXT_LINK_RE.search(response.text)
+            url = urljoin(response.url, html.unescape(next_link.group(1))) if next_link else None
+
+    def get(self, url, log=print):
+        host = urlparse(url).netloc
+
+        def attempt():
+            self.limiter.acquire(host)
+            response = self.session.get(url, timeout=self.timeout)
+            if response.status_code in RETRY_STATUSES:
+                error = requests.HTTPError(f"{response.status_code} {response.reason} for {url}", response=response)
+                error.retry_after = retry_after(response)
+                raise error
+            return response
+
+        try:
+            response = self.retry.call(attempt, (requests.ConnectionError, requests.Timeout, requests.HTTPError), log)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            status = e.response.status_code if e.response is not None else None
+            raise FetchError(f"GET {url} failed: {e}", status) from e
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+class SeleniumFetcher:
+    """Render the listing in a pooled headless Chrome and harvest every result.
+
+    Every failure of the browser session, including no browser becoming free
+    within `timeout`, is raised as FetchError.
+    """
+
+    name = "selenium"
+
+    def __init__(self, pool, timeout=120, retry=None, limiter=None):
+        self.pool = pool
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.limiter = limiter or get_rate_limiter()
+
+    def fetch(self, url, log=print, trace=None):
+        """Yield the rendered result pages once every result has been loaded"""
+        trace = trace or metrics.ScrapeTrace()
+        try:
+            pages = self.render(url, log, trace)
+        except TimeoutError as e:
+            raise FetchError(f"No browser free to load {url}: {e}") from e
+        except WebDriverException as e:
+            raise FetchError(f"Browser failed on {url}: {e.msg or type(e).__name__}") from e
+        # Hand the browser back to the pool before the pages are parsed
+        yield from pages
+
+    def render(self, url, log, trace):
+        """The cards of every result page, rendered in a pooled browser"""
+        started = time.perf_counter()
+        with self.pool.session(timeout=self.timeout) as driver:
+            # Waiting for a pooled browser, or starting one
+            trace.record('driver_start', time.perf_counter() - started)
+            log(f"Navigating to {url}...")
+            with trace.span('get', url=url):
+                self.navigate(driver, url, log)
+
+            # Wait until the project cards are rendered instead of sleeping a fixed time
+            log("Waiting for project cards...")
+            with trace.span('wait'):
+                card_count = wait_for_cards(driver)
+            if card_count:
+                log(f"{card_count} project cards rendered, loading the remaining results...")
+                pages = harvest_pages(driver, log=log, trace=trace, navigate=self.navigate)
             else:
-                print(f"  Configurations: N/A")
-        
-        # Save extracted data to JSON
-        with open(f"projects_data_{location}.json", "w", encoding="utf-8") as f:
-            json.dump(filtered_projects, f, indent=2, ensure_ascii=False)
-        
-        print(f"\n{'='*50}")
-        print("Project data saved to projects_data.json")
-        
+                # Nothing to cut down; the whole page is kept so a DOM dump shows what came back
+                log("No project cards appeared, using the page as is")
+                with trace.span('page_source'):
+                    pages = [driver.page_source]
+                record_page_weight(driver, trace)
+
+            log(f"\n{'='*50}")
+            log(f"Page Title: {driver.title}")
+            log(f"Current URL: {driver.current_url}")
+            log(f"{'='*50}\n")
+        return pages
+
+    def navigate(self, driver, url, log=print):
+        """driver.get behind the per-host rate limiter, retried on WebDriver errors and timeouts.
+
+        A session that has died is not retried, the same driver would only fail again.
+        """
+        host = urlparse(url).netloc
+
+        def attempt():
+            self.limiter.acquire(host)
+            try:
+                driver.get(url)
+            except WebDriverException as e:
+                if isinstance(e, (InvalidSessionIdException, NoSuchWindowException)) or not session_alive(driver):
+                    raise FetchError(f"Browser session lost loading {url}: {e.msg or type(e).__name__}") from e
+                raise
+
+        try:
+            self.retry.call(attempt, (WebDriverException,), log)
+        except WebDriverException as e:
+            raise FetchError(f"Could not load {url}: {e.msg or type(e).__name__}") from e
+
+    def close(self):
+        self.pool.close()
+
+
+def build_fetchers(mode="auto", pool=None, lean=True):
+    """Fetchers to try in order: the cheap HTTP path first, Chrome as the fallback"""
+    fetchers = []
+    if mode in ("auto", "http"):
+        fetchers.append(HttpFetcher())
+    if mode in ("auto", "selenium"):
+        fetchers.append(SeleniumFetcher(pool or BrowserPool(partial(create_driver, lean=lean), max_size=1)))
+    return fetchers
+
+
+def iter_projects(url, fetchers, parser=None, log=print, source=None, pages=None, trace=None):
+    """Yield unique projects page by page from the first fetcher that finds cards.
+
+    A fetcher that errors or finds no cards hands over to the next one;
+    projects already yielded are not repeated. Errors of the last fetcher
+    propagate. The name of the fetcher used is stored in `source['fetcher']`,
+    and every downloaded page is appended to `pages` when a list is given.
+    Fetch and parse phases, pages and cards found are recorded on `trace`.
+    """
+    trace = trace or metrics.ScrapeTrace()
+    seen = set()
+    for i, fetcher in enumerate(fetchers):
+        last = i == len(fetchers) - 1
+        found = False
+        try:
+            for page in fetcher.fetch(url, log=log, trace=trace):
+                if source is not None:
+                    source['fetcher'] = fetcher.name
+                if pages is not None:
+                    pages.append(page)
+                trace.count('pages')
+                # Parse time is only counted while the parser runs, not while the caller handles a project
+                parsed = dedupe_projects(parse_projects(page, parser, log=log), seen)
+                parse_seconds = 0.0
+                cards = 0
+                while True:
+                    started = time.perf_counter()
+                    project = next(parsed, None)
+                    parse_seconds += time.perf_counter() - started
+                    if project is None:
+                        break
+                    cards += 1
+                    found = True
+                    yield project
+                trace.record('parse', parse_seconds, cards=cards)
+                trace.count('cards_found', cards)
+        except Exception as e:
+            if last:
+                raise
+            log(f"{fetcher.name} fetch failed ({e}), falling back")
+            continue
+        if found or last:
+            return
+        log(f"No project cards from {fetcher.name}, falling back")
+
+
+class DomDump:
+    """Gzip file the fetched pages are written to as they arrive, for --dump-dom.
+
+    Used as the `pages` list of iter_projects, so no page is kept in memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.preview = None
+        self.count = 0
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+
+    def append(self, page):
+        if self.count:
+            self._file.write("\n")
+        self._file.write(page)
+        self.count += 1
+        if self.preview is None:
+            self.preview = page[:3000]
+
+    def close(self):
+        self._file.close()
+
+
+def write_ndjson(project, stream=None):
+    """Write one project as a JSON line and flush, so readers get it right away"""
+    stream = stream or sys.stdout
+    stream.write(json.dumps(project, ensure_ascii=False) + "\n")
+    stream.flush()
+
+
+def scrape(location, min_price, max_price, config, fetchers, base_url=BASE_URL, parser=None, incremental=False,
+           on_project=None, dump_dom=False, log=print, trace=None, map_view=True, export_json=True):
+    """Scrape one location with the given fetchers and save the results.
+
+    Projects are parsed page by page; `on_project` is called with each kept
+    project as soon as it is parsed. With `incremental` only the projects and
+    configurations that changed since the last stored scrape are written, and
+    the changes are logged instead of every project. `dump_dom` saves the raw
+    pages, gzip-compressed, to page_source_{location}.html.gz for debugging. `map_view=False`
+    requests the list-only page, skipping the map and its tiles. Projects go
+    to the snapshot file, and to projects_data_{location}.json with `export_json`.
+
+    Phase timings and card counts go to `trace` (a metrics.ScrapeTrace, one
+    is created if not given) and are stored with the run; the Prometheus
+    metrics file is rewritten afterwards.
+
+    Raises CircuitOpenError without fetching while the host's circuit breaker
+    is open, FetchError when the listing could not be downloaded (counted
+    by the breaker unless it was a 4xx answer) and NoResultsError when it had no project cards, so a
+    failed scrape never overwrites stored data with an empty result.
+    """
+    location = location.lower().replace(" ", "-")
+    full_url = build_url(location, min_price, max_price, config, base_url, map_view)
+    host = urlparse(full_url).netloc
+    breaker = get_circuit_breaker()
+    breaker.check(host)
+    trace = trace or metrics.ScrapeTrace()
+    trace.location = location
+    trace.watch_memory()
+
+    source = {}
+    # One file per location so parallel scrapes don't overwrite each other
+    pages = DomDump(f"page_source_{location}.html.gz") if dump_dom else None
+    extracted = 0
+    filtered_projects = []
+    try:
+        for project in iter_projects(full_url, fetchers, parser, log, source, pages, trace):
+            extracted += 1
+            # Under configurations, if bhk value contains Sold Out, we will ignore that configuration and not include it in the JSON output. Also if after not considering such configurations if there are no configurations left for a project, we will ignore that project and not include it in the JSON output
+            project = drop_sold_out(project)
+            if project is None:
+                continue
+            # Parse price, area, BHK and possession once here so the app only compares numbers
+            project = Project.from_dict(project).to_dict()
+            filtered_projects.append(project)
+            if on_project:
+                on_project(project)
+    except FetchError as e:
+        if e.status is None or e.status in RETRY_STATUSES:
+            breaker.record_failure(host)
+        else:
+            # The host answered, e.g. 404 for an unknown location
+            breaker.record_success(host)
+        raise
+    finally:
+        if pages is not None:
+            pages.close()
+    breaker.record_success(host)
+    fetcher_name = source.get('fetcher')
+    trace.count('cards_kept', len(filtered_projects))
+    log(f"Fetched results with {fetcher_name}")
+
+    if dump_dom:
+        # Print the start of the first page
+        log("DOM Content (first 3000 characters):")
+        log(pages.preview or "")
+        log(f"\n{'='*50}")
+        log(f"{pages.count} page(s) saved to {pages.path}")
+
+    if not extracted:
+        raise NoResultsError(f"No project cards found at {full_url}")
+
+    # Display extracted projects
+    log(f"\n{'='*50}")
+    log(f"Extracted {extracted} projects, {len(filtered_projects)} with available configurations:\n")
+
+    if incremental:
+        # Only write what changed since the stored snapshot of this location
+        with trace.span('write'):
+            run_id, delta = store.save_delta(location, filtered_projects, fetcher_name)
+            changed = (delta or location not in snapshot.read_manifest()
+                       or (export_json and not os.path.exists(f"projects_data_{location}.json")))
+            if changed:
+                paths = save_projects(location, filtered_projects, export_json)
+        log_delta(delta, log)
+        if changed:
+            log(f"Project data saved to {', '.join(paths)} and {store.DEFAULT_DB} (run {run_id})")
+        else:
+            log(f"No changes since the last scrape, {snapshot.SNAPSHOT_FILE} left as is (run {run_id})")
+        record_metrics(run_id, trace, log)
+        return filtered_projects
+
+    for i, project in enumerate(filtered_projects, 1):
+        log(f"\nProject {i}:")
+        log(f"  Name: {project.get('project_name', 'N/A')}")
+        log(f"  Builder: {project.get('builder_name', 'N/A')}")
+        log(f"  Possession: {project.get('possession_date', 'N/A')}")
+
+        if project.get('configurations'):
+            log(f"  Configurations:")
+            for config in project['configurations']:
+                log(f"    - {config.get('bhk', 'N/A')}: {config.get('size', 'N/A')} @ {config.get('price', 'N/A')}")
+        else:
+            log(f"  Configurations: N/A")
+
+    # Save extracted data to the snapshot (and JSON)
+    with trace.span('write'):
+        paths = save_projects(location, filtered_projects, export_json)
+        run_id = store.save_run(location, filtered_projects, fetcher_name)
+
+    log(f"\n{'='*50}")
+    log(f"Project data saved to {', '.join(paths)} and {store.DEFAULT_DB} (run {run_id})")
+    record_metrics(run_id, trace, log)
+
+    return filtered_projects
+
+
+def record_metrics(run_id, trace, log=print):
+    """Store the trace of a run and refresh the metrics file; failures are only logged"""
+    trace.finish()
+    log(f"Scrape took {trace.describe()}")
+    counters = dict(trace.counters, duration_seconds=round(trace.elapsed, 3))
+    try:
+        store.save_metrics(run_id, trace.summary(), counters)
+        metrics.write_prometheus()
     except Exception as e:
-        print(f"Error: {e}")
+        log(f"Could not record scrape metrics: {e}")
+
+
+class ScraperService:
+    """Long-lived scraper that keeps a warm pool of Chrome sessions.
+
+    Used in-process by app.py so repeat scrapes skip the browser start-up and
+    the interpreter/import cost of launching `python main.py`. Listings are
+    fetched over plain HTTP first; Chrome is only used when that yields no cards.
+    """
+
+    def __init__(self, max_browsers=2, max_uses=25, max_idle=600, fetcher="auto", base_url=BASE_URL,
+                 parser=None, incremental=False, lean=True, map_view=True, export_json=True):
+        self.pool = BrowserPool(partial(create_driver, lean=lean), max_size=max_browsers, max_uses=max_uses,
+                                max_idle=max_idle)
+        self.fetchers = build_fetchers(fetcher, self.pool)
+        self.base_url = base_url
+        self.parser = parser
+        self.incremental = incremental
+        self.map_view = map_view
+        self.export_json = export_json
+
+    def scrape(self, location, min_price=2500000, max_price=9999999999, config="", on_project=None, log=print):
+        """Scrape a location and return the filtered projects, streaming each to `on_project`"""
+        return scrape(location, min_price, max_price, config, self.fetchers, self.base_url, self.parser,
+                      self.incremental, on_project, log=log, map_view=self.map_view, export_json=self.export_json)
+
+    def close(self):
+        for fetcher in self.fetchers:
+            fetcher.close()
+        self.pool.close()
+
+
+def scrape_many(locations, min_price=2500000, max_price=9999999999, config="", workers=4, service=None, log=print):
+    """Scrape several locations in parallel over at most `workers` browsers.
+
+    Each location is written to the snapshot file (and its own projects_data_{location}.json). Returns
+    one result dict per location, in input order, with the number of projects,
+    elapsed seconds and the error message if the scrape failed.
+    """
+    if service is None:
+        service = ScraperService(max_browsers=workers)
+        owns_service = True
+    else:
+        owns_service = False
+
+    def run(location):
+        started = time.perf_counter()
+        prefix = f"[{location}]"
+        try:
+            projects = service.scrape(location, min_price, max_price, config, log=lambda *args: None)
+            result = {'location': location, 'ok': True, 'projects': len(projects), 'error': None}
+        except Exception as e:
+            result = {'location': location, 'ok': False, 'projects': 0, 'error': f"{type(e).__name__}: {e}"}
+        result['seconds'] = round(time.perf_counter() - started, 2)
+        status = f"{result['projects']} projects" if result['ok'] else f"FAILED: {result['error']}"
+        log(f"{prefix} {status} in {result['seconds']}s")
+        return result
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(run, locations))
+    finally:
+        if owns_service:
+            service.close()
+
+
+def print_batch_summary(results):
+    print(f"\n{'='*50}")
+    print(f"{'Location':<20} {'Status':<8} {'Projects':>8} {'Seconds':>8}")
+    for r in results:
+        status = "ok" if r['ok'] else "FAILED"
+        print(f"{r['location']:<20} {status:<8} {r['projects']:>8} {r['seconds']:>8}")
+    failed = [r for r in results if not r['ok']]
+    print(f"{len(results) - len(failed)}/{len(results)} locations scraped")
+    for r in failed:
+        print(f"  {r['location']}: {r['error']}")
+
+
+def main(location, min_price, max_price, config, fetcher="auto", base_url=BASE_URL, parser=None, incremental=False,
+         ndjson=False, dump_dom=False, events=None, lean=True, map_view=True, export_json=True):
+    """Scrape one location; returns the exit status, non-zero (ScrapeError.exit_code) when it failed"""
+    fetchers = build_fetchers(fetcher, lean=lean)
+    # In NDJSON mode stdout carries only the projects, progress goes to stderr
+    log = (lambda *args: print(*args, file=sys.stderr)) if ndjson else print
+    trace = metrics.ScrapeTrace(location, emit=metrics.ndjson_emitter(events) if events else None)
+    try:
+        scrape(location, min_price, max_price, config, fetchers, base_url, parser, incremental,
+               on_project=write_ndjson if ndjson else None, dump_dom=dump_dom, log=log, trace=trace,
+               map_view=map_view, export_json=export_json)
+    except ScrapeError as e:
+        log(f"Error: {type(e).__name__}: {e}")
+        return e.exit_code
+    except Exception as e:
+        log(f"Error: {e}")
+        return 1
     finally:
-        if driver:
-            driver.quit()
-            print("Browser closed.")
+        for f in fetchers:
+            f.close()
+    return 0
 
 
 if __name__ == "__main__":
@@ -185,7 +980,31 @@ if __name__ == "__main__":
     parser.add_argument("--min_price", type=int, default=2500000, help="Minimum price filter (default: 0)")
     parser.add_argument("--max_price", type=int, default=9999999999, help="Maximum price filter (default: 9999999999)")
     parser.add_argument("--config", type=str, default="", help="Configuration filter (default: 156,147,113,72,46,33,14-152,115,93,47,22-151,150,145,94,71,37,17)") # 156,147,113,72,46,33,14-152,115,93,47,22-151,150,145,94,71,37,17
+    parser.add_argument("--locations", type=str, default=None, help="Comma separated locations to scrape in parallel, or 'all' for the common locations")
+    parser.add_argument("--workers", type=int, default=4, help="Number of parallel browsers in batch mode (default: 4)")
+    parser.add_argument("--fetcher", choices=["auto", "http", "selenium"], default="auto", help="auto tries plain HTTP first and falls back to Chrome (default: auto)")
+    parser.add_argument("--base-url", type=str, default=BASE_URL, help=f"Listing base URL, e.g. a local fixture server (default: {BASE_URL})")
+    parser.add_argument("--ndjson", action="store_true", help="Stream each project to stdout as a JSON line as soon as it is parsed")
+    parser.add_argument("--dump-dom", action="store_true", help="Save the raw pages to page_source_{location}.html.gz and print the start of the DOM")
+    parser.add_argument("--incremental", action="store_true", help="Only write projects that changed since the last scrape")
+    parser.add_argument("--parser", choices=sorted(PARSERS), default=DEFAULT_PARSER, help=f"HTML parser backend (default: {DEFAULT_PARSER})")
+    parser.add_argument("--events", type=str, default=None, help="Append a JSON line per timed scrape phase to this file")
+    parser.add_argument("--no-lean", dest="lean", action="store_false", help="Load pages with images, fonts, maps and trackers, and a throwaway Chrome profile")
+    parser.add_argument("--no-map-view", dest="map_view", action="store_false", help="Request the list-only page instead of the map view")
+    parser.add_argument("--no-json", dest="export_json", action="store_false", help=f"Only write the snapshot ({snapshot.SNAPSHOT_FILE}), not projects_data_{{location}}.json")
 
     args = parser.parse_args()
-    
-    main(args.location, args.min_price, args.max_price, args.config)
\ No newline at end of file
+
+    if args.locations:
+        locations = COMMON_LOCATIONS if args.locations == "all" else [loc.strip() for loc in args.locations.split(",") if loc.strip()]
+        service = ScraperService(max_browsers=args.workers, fetcher=args.fetcher, base_url=args.base_url, parser=args.parser,
+                                 incremental=args.incremental, lean=args.lean, map_view=args.map_view,
+                                 export_json=args.export_json)
+        results = scrape_many(locations, args.min_price, args.max_price, args.config, workers=args.workers, service=service)
+        service.close()
+        print_batch_summary(results)
+        sys.exit(0 if all(r['ok'] for r in results) else 1)
+    else:
+        sys.exit(main(args.location, args.min_price, args.max_price, args.config, args.fetcher, args.base_url, args.parser,
+                      args.incremental, args.ndjson, args.dump_dom, args.events, args.lean, args.map_view,
+                      args.export_json))
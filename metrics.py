@@ -0,0 +1,200 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+
+import store
+
+# Phases of a scrape, in the order they happen
+PHASES = ('driver_start', 'get', 'wait', 'page_source', 'parse', 'write')
+
+METRICS_FILE = os.environ.get("SCRAPE_METRICS_FILE", "scrape_metrics.prom")
+
+
+def current_rss():
+    """Resident set size of this process in bytes, None where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class RssSampler:
+    """Peak resident memory of this process, sampled every `interval` seconds on a thread.
+
+    Browsers run in their own processes and are not included; concurrent
+    scrapes in one process see the same, shared peak.
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.peak is not None:
+            self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and return the peak in bytes, None if unsupported"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+        return self.peak
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is not None and rss > (self.peak or 0):
+            self.peak = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+
+class ScrapeTrace:
+    """Per-phase timings and counters of one scrape.
+
+    `span` and `record` add time to a phase (see PHASES) and `count` bumps a
+    counter such as cards found or kept. When `emit` is given every finished
+    span is passed to it as a dict event, e.g. to write one JSON line each.
+    """
+
+    def __init__(self, location=None, emit=None):
+        self.location = location
+        self.emit = emit
+        self.started_at = time.time()
+        self.phases = {}  # phase -> [seconds, calls]
+        self.counters = Counter()
+        self._rss = None
+
+    @contextmanager
+    def span(self, phase, **attrs):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started, **attrs)
+
+    def record(self, phase, seconds, **attrs):
+        totals = self.phases.setdefault(phase, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += 1
+        if self.emit:
+            self.emit({'event': 'span', 'location': self.location, 'phase': phase, 'seconds': round(seconds, 6),
+                       'ts': round(time.time(), 3), **attrs})
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def watch_memory(self, interval=0.05):
+        """Sample this process's RSS until `finish`, which stores the peak as `peak_rss_bytes`"""
+        if self._rss is None:
+            self._rss = RssSampler(interval).start()
+            # A scrape that fails before `finish` stops sampling when its trace goes away
+            weakref.finalize(self, self._rss._stop.set)
+
+    def finish(self):
+        if self._rss is not None:
+            peak = self._rss.stop()
+            if peak is not None:
+                self.counters['peak_rss_bytes'] = peak
+
+    @property
+    def elapsed(self):
+        return time.time() - self.started_at
+
+    def summary(self):
+        """Phases in PHASES order then any others, as {phase: (seconds, calls)}"""
+        order = [p for p in PHASES if p in self.phases] + [p for p in self.phases if p not in PHASES]
+        return {phase: tuple(self.phases[phase]) for phase in order}
+
+    def describe(self):
+        """One line breakdown for the scrape log"""
+        phases = ", ".join(f"{phase} {seconds:.2f}s" for phase, (seconds, _) in self.summary().items())
+        return (f"{self.elapsed:.2f}s total ({phases}); {self.counters['bytes_transferred'] / 1024:.0f} KiB in "
+                f"{self.counters['requests']} requests; "
+                f"{self.counters['cards_found']} cards found, {self.counters['cards_kept']} kept"
+                + (f"; peak RSS {self.counters['peak_rss_bytes'] / 2 ** 20:.0f} MiB" if self.counters['peak_rss_bytes'] else ""))
+
+
+def ndjson_emitter(path):
+    """An `emit` callback appending each event to `path` as a JSON line"""
+    lock = threading.Lock()
+
+    def emit(event):
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+    return emit
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def prometheus_text(db_path=store.DEFAULT_DB):
+    """Metrics of the last stored run of every location in the Prometheus text format"""
+    families = {
+        'scrape_phase_seconds': ("gauge", "Seconds spent in each phase of the last scrape", []),
+        'scrape_phase_calls': ("gauge", "Times each phase ran during the last scrape", []),
+        'scrape_duration_seconds': ("gauge", "Wall time of the last scrape", []),
+        'scrape_pages': ("gauge", "Pages fetched by the last scrape", []),
+        'scrape_cards_found': ("gauge", "Unique project cards parsed by the last scrape", []),
+        'scrape_cards_kept': ("gauge", "Projects kept after dropping sold out configurations", []),
+        'scrape_bytes_transferred': ("gauge", "Bytes downloaded by the last scrape, page and subresources", []),
+        'scrape_requests': ("gauge", "Requests made by the last scrape", []),
+        'scrape_page_load_ms': ("gauge", "Browser load time of the pages of the last scrape", []),
+        'scrape_peak_rss_bytes': ("gauge", "Peak resident memory of the scraping process during the last scrape", []),
+        'scrape_last_run_timestamp_seconds': ("gauge", "Unix time of the last scrape", []),
+    }
+    for location in store.locations(db_path):
+        run = store.last_run(location, db_path)
+        recorded = store.run_metrics(run['id'], db_path)
+        if not recorded:
+            continue
+        families['scrape_last_run_timestamp_seconds'][2].append((_labels(location=location), run['scraped_at']))
+        for phase, (seconds, calls) in recorded['phases'].items():
+            labels = _labels(location=location, phase=phase)
+            families['scrape_phase_seconds'][2].append((labels, seconds))
+            families['scrape_phase_calls'][2].append((labels, calls))
+        for name, value in recorded['counters'].items():
+            family = 'scrape_duration_seconds' if name == 'duration_seconds' else f"scrape_{name}"
+            if family in families:
+                families[family][2].append((_labels(location=location), value))
+
+    lines = []
+    for name, (kind, help_text, samples) in families.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(f"{name}{{{labels}}} {value}" for labels, value in samples)
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path=METRICS_FILE, db_path=store.DEFAULT_DB):
+    """Rewrite the metrics file, e.g. for node_exporter's textfile collector"""
+    # A temp file of its own per writer, so concurrent scrapes never replace each other's
+    fd, tmp = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp",
+                               dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(prometheus_text(db_path))
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
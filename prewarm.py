@@ -0,0 +1,120 @@
+import math
+import threading
+import time
+from collections import deque
+
+import jobs
+
+
+class Prewarmer:
+    """Refreshes the most requested locations before their cache entry expires.
+
+    Requests are counted per location with exponential decay (`half_life`
+    seconds), so the ranking follows recent demand. Every `interval` seconds
+    the `top_n` hottest locations that are missing from `cache` or expire
+    within `lead` seconds are submitted to `scheduler` as `make_job(location)`,
+    within a budget of `max_concurrent` running pre-warm scrapes and
+    `max_per_hour` started per hour. Only locations whose decayed score is at
+    least `min_score` are refreshed, so an idle app never scrapes. Locations
+    listed in `seed` start with a small score that only breaks ties in the
+    ranking; it is below `min_score` and never triggers a scrape by itself.
+    """
+
+    SEED_SCORE = 0.1
+
+    def __init__(self, cache, scheduler, make_job, top_n=5, lead=900, interval=60,
+                 max_concurrent=1, max_per_hour=6, half_life=24 * 3600, seed=(), min_score=0.5):
+        self.cache = cache
+        self.scheduler = scheduler
+        self.make_job = make_job
+        self.top_n = top_n
+        self.lead = lead
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        self.max_per_hour = max_per_hour
+        self.half_life = half_life
+        self.min_score = min_score
+        self._scores = {}  # location -> (score, updated_at)
+        self._started = deque()  # start times of pre-warm scrapes in the last hour
+        self._jobs = {}  # location -> job id of a pre-warm scrape
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        for location in seed:
+            self._scores[location] = (self.SEED_SCORE, time.time())
+
+    def record_request(self, location, weight=1.0):
+        """Count a user viewing `location`"""
+        with self._lock:
+            self._scores[location] = (self._score(location, time.time()) + weight, time.time())
+
+    def hottest(self, n=None):
+        """Locations ranked by decayed request count, hottest first"""
+        now = time.time()
+        with self._lock:
+            ranked = sorted(self._scores, key=lambda loc: self._score(loc, now), reverse=True)
+        return ranked[:n or self.top_n]
+
+    def tick(self):
+        """Submit due refreshes within the budget; returns the locations submitted"""
+        now = time.time()
+        with self._lock:
+            while self._started and now - self._started[0] > 3600:
+                self._started.popleft()
+            for location, job_id in list(self._jobs.items()):
+                status = self.scheduler.status(job_id)
+                if status is None or status['state'] not in (jobs.QUEUED, jobs.RUNNING):
+                    del self._jobs[location]
+
+        submitted = []
+        for location in self.hottest():
+            with self._lock:
+                if self._score(location, time.time()) < self.min_score:
+                    # Ranked by score, so the rest have no real demand either
+                    break
+                if len(self._jobs) >= self.max_concurrent or len(self._started) >= self.max_per_hour:
+                    break
+                if location in self._jobs:
+                    continue
+            if self.scheduler.active_job(location) or self.cache.is_loading(location):
+                continue
+            expires_in = self.cache.expires_in(location)
+            if expires_in is not None and expires_in > self.lead:
+                continue
+            job_id = self.scheduler.submit(location, self.make_job(location))
+            with self._lock:
+                self._jobs[location] = job_id
+                self._started.append(now)
+            submitted.append(location)
+        return submitted
+
+    def start(self):
+        """Run `tick` every `interval` seconds on a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="prewarm", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            return {
+                'scores': {loc: round(self._score(loc, now), 2) for loc in self._scores},
+                'running': dict(self._jobs),
+                'started_last_hour': len(self._started),
+            }
+
+    def _score(self, location, now):
+        # Caller holds the lock
+        score, updated_at = self._scores.get(location, (0.0, now))
+        return score * math.pow(0.5, (now - updated_at) / self.half_life)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Pre-warm tick failed: {e}")
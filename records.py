@@ -0,0 +1,147 @@
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+
+PRICE_RE = re.compile(r'([\d.]+)\s*([LC])')
+AREA_RE = re.compile(r'([\d.]+)\s*sq\.?ft\.?', re.IGNORECASE)
+BHK_RE = re.compile(r'(\d+(?:\.\d+)?)\s*BHK', re.IGNORECASE)
+POSSESSION_RE = re.compile(r'([A-Za-z]+)[,\s]+(\d{4})')
+
+MONTHS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12,
+    'January': 1, 'February': 2, 'March': 3, 'April': 4, 'June': 6,
+    'July': 7, 'August': 8, 'September': 9, 'October': 10, 'November': 11, 'December': 12
+}
+
+
+def parse_price(price_str):
+    """Price string such as "85 L" or "1.2 Cr" in rupees, 0 if unparsable"""
+    match = PRICE_RE.search(price_str or '')
+    if not match:
+        return 0
+    try:
+        value = float(match.group(1))
+    except ValueError:
+        return 0
+    return round(value * (100000 if match.group(2) == 'L' else 10000000))
+
+
+def parse_area(size_str):
+    """Carpet area in sq.ft. from a string such as "750 sq.ft.", None if missing"""
+    match = AREA_RE.search(size_str or '')
+    if not match:
+        return None
+    try:
+        return float(match.group(1))
+    except ValueError:
+        return None
+
+
+def parse_bhk(bhk_str):
+    """Bedroom count from a string such as "2.5 BHK", None if missing"""
+    match = BHK_RE.search(bhk_str or '')
+    return float(match.group(1)) if match else None
+
+
+def is_ready_to_move(possession_str):
+    return bool(possession_str) and ("Ready to Move" in possession_str or "Ready To Move" in possession_str)
+
+
+def parse_possession_month(possession_str):
+    """Possession as a yyyymm integer (e.g. 202712 for "Dec, 2027"), None if unknown.
+
+    "Ready to Move" has no fixed month, see `is_ready_to_move`.
+    """
+    if not possession_str or possession_str == "N/A" or is_ready_to_move(possession_str):
+        return None
+    match = POSSESSION_RE.search(possession_str)
+    if not match:
+        return None
+    return int(match.group(2)) * 100 + MONTHS.get(match.group(1), 1)
+
+
+def current_month():
+    now = datetime.now()
+    return now.year * 100 + now.month
+
+
+@dataclass(slots=True)
+class Configuration:
+    """One flat configuration of a project, raw strings plus parsed numbers"""
+
+    bhk: str = ''
+    size: str = ''
+    price: str = ''
+    price_inr: int = 0
+    carpet_sqft: float | None = None
+    bhk_count: float | None = None
+
+    @classmethod
+    def from_raw(cls, bhk='', size='', price=''):
+        return cls(bhk, size, price, parse_price(price), parse_area(size), parse_bhk(bhk))
+
+    @classmethod
+    def from_dict(cls, data):
+        if 'price_inr' not in data:
+            return cls.from_raw(data.get('bhk', ''), data.get('size', ''), data.get('price', ''))
+        return cls(data.get('bhk', ''), data.get('size', ''), data.get('price', ''),
+                   data['price_inr'], data.get('carpet_sqft'), data.get('bhk_count'))
+
+    def to_dict(self):
+        return {
+            'bhk': self.bhk,
+            'size': self.size,
+            'price': self.price,
+            'price_inr': self.price_inr,
+            'carpet_sqft': self.carpet_sqft,
+            'bhk_count': self.bhk_count,
+        }
+
+
+@dataclass(slots=True)
+class Project:
+    """A scraped project with its possession date parsed once at scrape time"""
+
+    project_name: str
+    builder_name: str | None = None
+    possession_date: str | None = None
+    possession_month: int | None = None
+    ready_to_move: bool = False
+    configurations: list = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Project from a parsed or saved dict, filling in any missing numeric fields"""
+        possession = data.get('possession_date')
+        if 'possession_month' in data:
+            possession_month = data['possession_month']
+            ready = data.get('ready_to_move', False)
+        else:
+            possession_month = parse_possession_month(possession)
+            ready = is_ready_to_move(possession)
+        return cls(
+            data.get('project_name', ''),
+            data.get('builder_name'),
+            possession,
+            possession_month,
+            ready,
+            [Configuration.from_dict(c) for c in data.get('configurations', [])],
+        )
+
+    def to_dict(self):
+        data = {'project_name': self.project_name}
+        # Keep the raw keys absent when the card had no value, as parse_projects does
+        if self.builder_name is not None:
+            data['builder_name'] = self.builder_name
+        if self.possession_date is not None:
+            data['possession_date'] = self.possession_date
+        data['possession_month'] = self.possession_month
+        data['ready_to_move'] = self.ready_to_move
+        data['configurations'] = [c.to_dict() for c in self.configurations]
+        return data
+
+
+def normalize_projects(projects):
+    """Project dicts with the numeric fields present, e.g. for JSON saved before they existed"""
+    return [Project.from_dict(p).to_dict() for p in projects]
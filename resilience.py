@@ -0,0 +1,165 @@
+import random
+import threading
+import time
+
+
+class ScrapeError(Exception):
+    """A scrape that could not produce fresh listings; `exit_code` is what main.py exits with"""
+
+    exit_code = 1
+
+
+class FetchError(ScrapeError):
+    """The listing could not be downloaded, even after retries; `status` is the HTTP status if there was one"""
+
+    exit_code = 3
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(ScrapeError):
+    """Too many recent scrapes of the host failed; not trying again until the breaker resets"""
+
+    exit_code = 4
+
+
+class NoResultsError(ScrapeError):
+    """The listing came back without any project card"""
+
+    exit_code = 5
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter.
+
+    An attempt failing with one of `retry_on` is retried up to `attempts`
+    times in total, sleeping a random time between 0 and
+    min(`cap`, `base` * 2 ** attempt) seconds in between.
+    """
+
+    def __init__(self, attempts=3, base=0.5, cap=10.0):
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+    def call(self, fn, retry_on=(Exception,), log=None):
+        """Return fn(), retrying it on `retry_on` errors; the last error is raised"""
+        for attempt in range(self.attempts):
+            try:
+                return fn()
+            except retry_on as e:
+                if attempt == self.attempts - 1:
+                    raise
+                delay = max(self.delay(attempt), getattr(e, 'retry_after', 0) or 0)
+                if log:
+                    log(f"Attempt {attempt + 1} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+
+class RateLimiter:
+    """Token bucket per host: at most `rate` requests per second, bursts of up to `burst`.
+
+    Shared by every scrape in the process, so concurrent scrapes of one host
+    are throttled together.
+    """
+
+    def __init__(self, rate=1.0, burst=3):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}  # host -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def acquire(self, host):
+        """Block until a request to `host` is allowed; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, updated_at = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return waited
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class CircuitBreaker:
+    """Stops scraping a host after `failure_threshold` failed scrapes in a row.
+
+    While open, `check` raises CircuitOpenError so callers serve cached data
+    instead; after `reset_timeout` seconds one trial scrape is let through
+    (half-open) and its outcome closes or re-opens the breaker. A trial that
+    never reports back is given up on after another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=300):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts = {}  # host -> [consecutive failures, opened_at, trial started_at]
+        self._lock = threading.Lock()
+
+    def check(self, host):
+        """Raise CircuitOpenError unless a scrape of `host` may go ahead"""
+        with self._lock:
+            state = self._hosts.setdefault(host, [0, None, None])
+            failures, opened_at, trial_at = state
+            if opened_at is None:
+                return
+            now = time.monotonic()
+            retry_in = max(self.reset_timeout - (now - opened_at),
+                           self.reset_timeout - (now - trial_at) if trial_at is not None else 0)
+            if retry_in > 0:
+                raise CircuitOpenError(f"{host} is failing ({failures} failed scrapes in a row), "
+                                       f"next attempt in {retry_in:.0f}s")
+            state[2] = now  # half-open: this caller is the trial
+
+    def record_success(self, host):
+        with self._lock:
+            self._hosts[host] = [0, None, None]
+
+    def record_failure(self, host):
+        with self._lock:
+            state = self._hosts.setdefault(host, [0, None, None])
+            state[0] += 1
+            if state[0] >= self.failure_threshold:
+                state[1] = time.monotonic()
+            state[2] = None
+
+    def state(self, host):
+        """State of the breaker for `host`: closed, open or half-open"""
+        with self._lock:
+            failures, opened_at, trial_at = self._hosts.get(host, (0, None, None))
+        if opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - opened_at >= self.reset_timeout else "open"
+
+
+_rate_limiter = None
+_circuit_breaker = None
+_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide per-host RateLimiter, creating it on first use"""
+    global _rate_limiter
+    with _lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+        return _rate_limiter
+
+
+def get_circuit_breaker():
+    """Return the process-wide CircuitBreaker, creating it on first use"""
+    global _circuit_breaker
+    with _lock:
+        if _circuit_breaker is None:
+            _circuit_breaker = CircuitBreaker()
+        return _circuit_breaker
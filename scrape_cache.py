@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, wait
+
+
+class ScrapeCache:
+    """Process-wide cache of scraped projects per location.
+
+    Entries expire after a per-location TTL (`ttls`, else `default_ttl`
+    seconds), and the least recently used entry is evicted once there are
+    more than `max_entries`. Loads are single-flight: while a location is
+    being loaded, other callers asking for it wait for that same load instead
+    of starting their own scrape.
+    """
+
+    def __init__(self, default_ttl=6 * 3600, max_entries=32, ttls=None):
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.ttls = dict(ttls or {})
+        self._entries = OrderedDict()  # location -> (data, loaded_at)
+        self._inflight = {}  # location -> (Future, forced)
+        self._lock = threading.Lock()
+
+    def ttl(self, location):
+        return self.ttls.get(location, self.default_ttl)
+
+    def get(self, location):
+        """Return the cached data for `location`, or None if missing or expired"""
+        with self._lock:
+            return self._get_fresh(location)
+
+    def put(self, location, data):
+        with self._lock:
+            self._put(location, data)
+
+    def invalidate(self, location):
+        with self._lock:
+            self._entries.pop(location, None)
+
+    def get_or_load(self, location, loader, force=False):
+        """Return cached data, or load it with `loader()` exactly once across threads.
+
+        With `force` the cached entry is ignored and only another forced load
+        in flight is shared; a plain load in flight (e.g. a disk read) is
+        waited for, then `loader` runs. Errors from the loader are raised in
+        every waiting caller, and a loader returning None (nothing to load) is
+        not cached.
+        """
+        while True:
+            with self._lock:
+                if not force:
+                    data = self._get_fresh(location)
+                    if data is not None:
+                        return data
+                inflight = self._inflight.get(location)
+                if inflight is None:
+                    future = Future()
+                    self._inflight[location] = (future, force)
+                    break
+            future, forced = inflight
+            if forced or not force:
+                return future.result()
+            wait([future])
+
+        try:
+            data = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[location]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            if data is not None:
+                self._put(location, data)
+            del self._inflight[location]
+        future.set_result(data)
+        return data
+
+    def is_loading(self, location):
+        with self._lock:
+            return location in self._inflight
+
+    def locations(self):
+        """Locations with a fresh entry, most recently used last"""
+        with self._lock:
+            return [loc for loc in list(self._entries) if self._get_fresh(loc, touch=False) is not None]
+
+    def age(self, location):
+        """Seconds since `location` was loaded, None if not cached"""
+        with self._lock:
+            entry = self._entries.get(location)
+            return None if entry is None else time.monotonic() - entry[1]
+
+    def expires_in(self, location):
+        """Seconds until `location` expires, None if not cached"""
+        with self._lock:
+            entry = self._entries.get(location)
+            return None if entry is None else self.ttl(location) - (time.monotonic() - entry[1])
+
+    def _get_fresh(self, location, touch=True):
+        # Caller holds the lock
+        entry = self._entries.get(location)
+        if entry is None:
+            return None
+        data, loaded_at = entry
+        if time.monotonic() - loaded_at > self.ttl(location):
+            del self._entries[location]
+            return None
+        if touch:
+            self._entries.move_to_end(location)
+        return data
+
+    def _put(self, location, data):
+        # Caller holds the lock
+        self._entries[location] = (data, time.monotonic())
+        self._entries.move_to_end(location)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
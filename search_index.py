@@ -0,0 +1,121 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Score of a query token against a name token, by kind of match
+EXACT, PREFIX, INFIX, FUZZY = 1.0, 0.9, 0.7, 0.6
+# Matches in the builder name count for a bit less than in the project name
+FIELD_WEIGHTS = (1.0, 0.8)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance of a and b, or limit + 1 once it is known to exceed `limit`"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def max_edits(token):
+    return 0 if len(token) < 4 else 1 if len(token) < 7 else 2
+
+
+class SearchIndex:
+    """Inverted index over project and builder names with prefix and typo-tolerant lookup.
+
+    Built once per dataset from `(doc_id, project_name, builder_name)`
+    entries. The index maps each distinct name token to the documents and
+    fields it occurs in; lookups only touch the token vocabulary (sorted for
+    prefixes, trigram-indexed for infix and fuzzy matches), never every
+    document. Every query token has to match a token of the document.
+    """
+
+    def __init__(self, entries):
+        self._postings = defaultdict(dict)  # token -> {doc_id: best field weight}
+        for doc_id, *fields in entries:
+            for weight, text in zip(FIELD_WEIGHTS, fields):
+                for token in tokenize(text):
+                    postings = self._postings[token]
+                    if postings.get(doc_id, 0) < weight:
+                        postings[doc_id] = weight
+        self._vocabulary = sorted(self._postings)
+        self._trigrams = defaultdict(set)
+        for token in self._vocabulary:
+            for gram in trigrams(token):
+                self._trigrams[gram].add(token)
+
+    def __len__(self):
+        return len(self._vocabulary)
+
+    def search(self, query, limit=None):
+        """Ranked [(doc_id, score)] of documents matching every token of `query`"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        scores = None
+        for token in tokens:
+            token_scores = {}
+            for vocab_token, match_score in self._match_token(token).items():
+                for doc_id, weight in self._postings[vocab_token].items():
+                    score = match_score * weight
+                    if score > token_scores.get(doc_id, 0):
+                        token_scores[doc_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: scores[doc_id] + s for doc_id, s in token_scores.items() if doc_id in scores}
+            if not scores:
+                return []
+        ranked = sorted(((doc_id, s / len(tokens)) for doc_id, s in scores.items()), key=lambda item: -item[1])
+        return ranked[:limit] if limit else ranked
+
+    def _match_token(self, token):
+        """Vocabulary tokens matching one query token, with their match score"""
+        matches = {}
+        if token in self._postings:
+            matches[token] = EXACT
+
+        # Prefix matches are a contiguous run of the sorted vocabulary
+        i = bisect_left(self._vocabulary, token)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(token):
+            matches.setdefault(self._vocabulary[i], PREFIX)
+            i += 1
+
+        if len(token) < 3:
+            return matches
+
+        # Infix and typo candidates share at least one trigram with the query token
+        candidates = set()
+        for gram in trigrams(token):
+            candidates |= self._trigrams.get(gram, set())
+        limit = max_edits(token)
+        for candidate in candidates:
+            if candidate in matches:
+                continue
+            if token in candidate:
+                matches[candidate] = INFIX
+            elif limit:
+                # Compare against the whole token and against a prefix of it, so partly typed words match too
+                distance = min(edit_distance(token, candidate, limit),
+                               edit_distance(token, candidate[:len(token)], limit))
+                if distance <= limit:
+                    matches[candidate] = FUZZY - 0.1 * (distance - 1)
+        return matches
@@ -0,0 +1,203 @@
+"""Compact snapshot of the latest projects of every location in one file.
+
+Layout: a magic line, the manifest length, the JSON manifest
+({location: offset, length, counts, saved_at}) and one zlib-compressed
+columnar block per location. Listing locations reads only the manifest and
+loading a location decompresses only its block, read through mmap.
+
+    python snapshot.py                  # list the locations in the snapshot
+    python snapshot.py --import-json    # pack projects_data_*.json files into it
+"""
+import argparse
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+import records
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within this process
+    fcntl = None
+
+SNAPSHOT_FILE = os.environ.get("PROP_SEARCH_SNAPSHOT", "snapshots.bin")
+MAGIC = b"PSNAP1\n"
+HEADER = struct.Struct("<7sI")  # magic, manifest length
+
+PROJECT_COLUMNS = ('project_name', 'builder_name', 'possession_date', 'possession_month', 'ready_to_move')
+CONFIG_COLUMNS = ('bhk', 'size', 'price', 'price_inr', 'carpet_sqft', 'bhk_count')
+# Raw keys left out of a project dict when the card had no value, see records.Project.to_dict
+OPTIONAL_KEYS = ('builder_name', 'possession_date')
+
+_write_lock = threading.Lock()
+_manifest_cache = {}  # path -> ((mtime_ns, size), manifest)
+
+
+def encode_projects(projects):
+    """Compressed column-per-field block of project dicts"""
+    columns = {name: [] for name in PROJECT_COLUMNS + ('config_count',) + CONFIG_COLUMNS}
+    for project in projects:
+        for name in PROJECT_COLUMNS:
+            columns[name].append(project.get(name))
+        configs = project.get('configurations', [])
+        columns['config_count'].append(len(configs))
+        for config in configs:
+            for name in CONFIG_COLUMNS:
+                columns[name].append(config.get(name))
+    payload = json.dumps(columns, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return zlib.compress(payload, 6)
+
+
+def decode_projects(block):
+    """Project dicts, shaped like records.Project.to_dict, from an encode_projects block"""
+    columns = json.loads(zlib.decompress(block))
+    configs = [dict(zip(CONFIG_COLUMNS, row)) for row in zip(*(columns[name] for name in CONFIG_COLUMNS))]
+    projects = []
+    start = 0
+    for row, count in zip(zip(*(columns[name] for name in PROJECT_COLUMNS)), columns['config_count']):
+        project = dict(zip(PROJECT_COLUMNS, row))
+        for key in OPTIONAL_KEYS:
+            if project[key] is None:
+                del project[key]
+        project['ready_to_move'] = bool(project['ready_to_move'])
+        project['configurations'] = configs[start:start + count]
+        start += count
+        projects.append(project)
+    return projects
+
+
+def _read_header(buffer):
+    """(manifest, offset of the first block) of a snapshot held in `buffer`"""
+    magic, length = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a project snapshot file")
+    manifest = json.loads(bytes(buffer[HEADER.size:HEADER.size + length]))
+    return manifest, HEADER.size + length
+
+
+def read_manifest(path=SNAPSHOT_FILE):
+    """{location: entry} of the snapshot, {} if there is none; re-read only when the file changes"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return {}
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _manifest_cache.get(path)
+    if cached is None or cached[0] != key:
+        with open(path, 'rb') as f:
+            head = f.read(HEADER.size)
+            _, length = HEADER.unpack(head)
+            manifest, _ = _read_header(head + f.read(length))
+        cached = (key, manifest)
+        _manifest_cache[path] = cached
+    return cached[1]
+
+
+def locations(path=SNAPSHOT_FILE):
+    return sorted(read_manifest(path))
+
+
+def load_projects(location, path=SNAPSHOT_FILE):
+    """Projects of `location` from the snapshot, None if it has none"""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        # Header and block come from the same open file, so a concurrent rewrite can't mix them up
+        manifest, data_start = _read_header(buffer)
+        entry = manifest.get(location)
+        if entry is None:
+            return None
+        start = data_start + entry['offset']
+        return decode_projects(buffer[start:start + entry['length']])
+
+
+@contextmanager
+def _locked(path):
+    with _write_lock, open(f"{path}.lock", "w") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def _write(path, blocks):
+    """Rewrite the snapshot atomically from {location: (entry, block bytes)}"""
+    manifest = {}
+    offset = 0
+    for location, (entry, block) in sorted(blocks.items()):
+        manifest[location] = dict(entry, offset=offset, length=len(block))
+        offset += len(block)
+    header = json.dumps(manifest, separators=(',', ':')).encode('utf-8')
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(header)))
+        f.write(header)
+        for location in manifest:
+            f.write(blocks[location][1])
+    os.replace(tmp, path)
+
+
+def _existing_blocks(path):
+    """{location: (entry, block bytes)} of the current snapshot, still compressed"""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return {}
+    with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        manifest, data_start = _read_header(buffer)
+        return {location: (entry, buffer[data_start + entry['offset']:data_start + entry['offset'] + entry['length']])
+                for location, entry in manifest.items()}
+
+
+def save_many(projects_by_location, path=SNAPSHOT_FILE):
+    """Replace the projects of several locations; the other locations are copied over untouched"""
+    with _locked(path):
+        blocks = _existing_blocks(path)
+        for location, projects in projects_by_location.items():
+            entry = {
+                'projects': len(projects),
+                'configs': sum(len(p.get('configurations', [])) for p in projects),
+                'saved_at': time.time(),
+            }
+            blocks[location] = (entry, encode_projects(projects))
+        _write(path, blocks)
+    return path
+
+
+def save_projects(location, projects, path=SNAPSHOT_FILE):
+    """Replace the projects of one location in the snapshot"""
+    return save_many({location: projects}, path)
+
+
+def import_json_files(pattern="projects_data_*.json", path=SNAPSHOT_FILE):
+    """Pack projects_data_{location}.json files into the snapshot, returns the locations imported"""
+    projects_by_location = {}
+    for filename in sorted(glob.glob(pattern)):
+        location = os.path.basename(filename)[len('projects_data_'):-len('.json')]
+        with open(filename, encoding='utf-8') as f:
+            projects_by_location[location] = records.normalize_projects(json.load(f))
+    if projects_by_location:
+        save_many(projects_by_location, path)
+    return sorted(projects_by_location)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--import-json", nargs="?", const="projects_data_*.json", metavar="PATTERN",
+                        help="Pack JSON files into the snapshot (default: projects_data_*.json)")
+    parser.add_argument("--snapshot", default=SNAPSHOT_FILE, help=f"Snapshot file (default: {SNAPSHOT_FILE})")
+    args = parser.parse_args()
+
+    if args.import_json:
+        imported = import_json_files(args.import_json, args.snapshot)
+        print(f"Imported {len(imported)} location(s) into {args.snapshot}: {', '.join(imported)}")
+    for location, entry in sorted(read_manifest(args.snapshot).items()):
+        print(f"{location:<20} {entry['projects']:>6} projects {entry['configs']:>7} configurations "
+              f"{entry['length'] / 1024:>8.1f} KiB")
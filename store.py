@@ -0,0 +1,350 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import changes
+
+DEFAULT_DB = os.environ.get("PROP_SEARCH_DB", "listings.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_runs (
+    id INTEGER PRIMARY KEY,
+    location TEXT NOT NULL,
+    scraped_at REAL NOT NULL,
+    fetcher TEXT,
+    project_count INTEGER NOT NULL,
+    config_count INTEGER NOT NULL,
+    incremental INTEGER NOT NULL DEFAULT 0,
+    projects_added INTEGER,
+    projects_removed INTEGER,
+    projects_changed INTEGER
+);
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES scrape_runs(id) ON DELETE CASCADE,
+    removed_run INTEGER,
+    location TEXT NOT NULL,
+    project_name TEXT NOT NULL,
+    builder_name TEXT,
+    possession_date TEXT,
+    possession_month INTEGER,
+    ready_to_move INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS configurations (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    run_id INTEGER NOT NULL,
+    removed_run INTEGER,
+    location TEXT NOT NULL,
+    bhk TEXT,
+    size TEXT,
+    price TEXT,
+    price_inr INTEGER NOT NULL,
+    carpet_sqft REAL,
+    bhk_count REAL
+);
+CREATE TABLE IF NOT EXISTS run_metrics (
+    run_id INTEGER NOT NULL REFERENCES scrape_runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    phase TEXT NOT NULL DEFAULT '',
+    value REAL NOT NULL,
+    calls INTEGER,
+    PRIMARY KEY (run_id, name, phase)
+);
+"""
+
+# Rows are never rewritten: a run inserts what appeared (run_id) and stamps
+# removed_run on what disappeared, so "removed_run IS NULL" is the current
+# snapshot and the closed rows are the price and possession history. A new
+# possession date closes the project row and inserts a new version of it.
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_runs_location ON scrape_runs(location, id);
+CREATE INDEX IF NOT EXISTS idx_projects_current ON projects(location, removed_run, project_name);
+CREATE INDEX IF NOT EXISTS idx_projects_possession ON projects(possession_month);
+CREATE INDEX IF NOT EXISTS idx_configs_project ON configurations(project_id, removed_run);
+CREATE INDEX IF NOT EXISTS idx_configs_location_price ON configurations(location, removed_run, price_inr);
+CREATE INDEX IF NOT EXISTS idx_configs_bhk ON configurations(bhk_count, price_inr);
+"""
+
+_ready = set()  # absolute paths of databases whose schema is set up in this process
+_ready_lock = threading.Lock()
+
+
+def connect(db_path=DEFAULT_DB):
+    """Open the listings database, creating the schema on first use in this process"""
+    path = os.path.abspath(db_path)
+    if not os.path.exists(path):
+        _ready.discard(path)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys=ON")
+    if path not in _ready:
+        with _ready_lock:
+            if path not in _ready:
+                # WAL lets the app read while a scrape is writing; the mode is stored in the file
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+                conn.executescript(INDEXES)
+                _ready.add(path)
+    return conn
+
+
+def _insert_run(conn, location, projects, fetcher, delta=None):
+    config_count = sum(len(p.get('configurations', [])) for p in projects)
+    counts = (len(delta.added), len(delta.removed), len(delta.changed)) if delta is not None else (None, None, None)
+    return conn.execute(
+        "INSERT INTO scrape_runs (location, scraped_at, fetcher, project_count, config_count, incremental,"
+        " projects_added, projects_removed, projects_changed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (location, time.time(), fetcher, len(projects), config_count, int(delta is not None), *counts),
+    ).lastrowid
+
+
+def _config_row(project_id, run_id, location, config):
+    return (project_id, run_id, location, config.get('bhk'), config.get('size'), config.get('price'),
+            config['price_inr'], config['carpet_sqft'], config['bhk_count'])
+
+
+def _insert_configs(conn, rows):
+    conn.executemany(
+        "INSERT INTO configurations (project_id, run_id, location, bhk, size, price, price_inr, carpet_sqft, bhk_count)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+def _insert_projects(conn, run_id, location, projects):
+    config_rows = []
+    for project in projects:
+        project_id = conn.execute(
+            "INSERT INTO projects (run_id, location, project_name, builder_name, possession_date, possession_month, ready_to_move)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (run_id, location, project.get('project_name'), project.get('builder_name'), project.get('possession_date'),
+             project.get('possession_month'), int(bool(project.get('ready_to_move')))),
+        ).lastrowid
+        for config in project.get('configurations', []):
+            config_rows.append(_config_row(project_id, run_id, location, config))
+    _insert_configs(conn, config_rows)
+
+
+def save_run(location, projects, fetcher=None, db_path=DEFAULT_DB):
+    """Replace the current snapshot of `location` in a single transaction, returns the run id.
+
+    `projects` are dicts carrying the numeric fields from records.py.
+    """
+    with closing(connect(db_path)) as conn, conn:
+        run_id = _insert_run(conn, location, projects, fetcher)
+        for table in ('projects', 'configurations'):
+            conn.execute(f"UPDATE {table} SET removed_run = ? WHERE location = ? AND removed_run IS NULL",
+                         (run_id, location))
+        _insert_projects(conn, run_id, location, projects)
+    return run_id
+
+
+def save_delta(location, projects, fetcher=None, db_path=DEFAULT_DB):
+    """Diff a scrape against the stored snapshot of `location` and write only the changes.
+
+    New projects and configurations are inserted, vanished ones get their
+    removed_run set and unchanged rows are left alone. A project whose
+    possession changed is closed and inserted again with its configurations.
+    Returns (run id, changes.Delta), all in one transaction.
+    """
+    with closing(connect(db_path)) as conn, conn:
+        current, project_ids, config_ids = _current_snapshot(conn, location)
+        delta = changes.diff_projects(current, projects)
+        run_id = _insert_run(conn, location, projects, fetcher, delta)
+
+        rescheduled = [change for change in delta.changed if change.possession_changed]
+        _insert_projects(conn, run_id, location, delta.added + [change.new for change in rescheduled])
+
+        removed = [(run_id, project_ids[changes.project_key(p)]) for p in delta.removed + [c.old for c in rescheduled]]
+        conn.executemany("UPDATE projects SET removed_run = ? WHERE id = ?", removed)
+        conn.executemany("UPDATE configurations SET removed_run = ? WHERE project_id = ? AND removed_run IS NULL", removed)
+
+        config_rows = []
+        closed_configs = []
+        for change in delta.changed:
+            if change.possession_changed:
+                continue
+            key = changes.project_key(change.new)
+            project_id = project_ids[key]
+            for config in change.removed_configs:
+                closed_configs.append((run_id, config_ids[key][changes.config_key(config)].pop()))
+            for config in change.added_configs:
+                config_rows.append(_config_row(project_id, run_id, location, config))
+        conn.executemany("UPDATE configurations SET removed_run = ? WHERE id = ?", closed_configs)
+        _insert_configs(conn, config_rows)
+    return run_id, delta
+
+
+def _project_dict(row):
+    project = {'project_name': row['project_name']}
+    # Same shape as records.Project.to_dict: raw keys only when the card had them
+    if row['builder_name'] is not None:
+        project['builder_name'] = row['builder_name']
+    if row['possession_date'] is not None:
+        project['possession_date'] = row['possession_date']
+    project['possession_month'] = row['possession_month']
+    project['ready_to_move'] = bool(row['ready_to_move'])
+    project['configurations'] = []
+    return project
+
+
+def _config_dict(row):
+    return {
+        'bhk': row['bhk'],
+        'size': row['size'],
+        'price': row['price'],
+        'price_inr': row['price_inr'],
+        'carpet_sqft': row['carpet_sqft'],
+        'bhk_count': row['bhk_count'],
+    }
+
+
+def _current_snapshot(conn, location):
+    """Current projects of a location, plus the row ids needed to close them"""
+    projects = {}
+    project_ids = {}
+    rows = conn.execute("SELECT * FROM projects WHERE location = ? AND removed_run IS NULL ORDER BY id", (location,))
+    for row in rows:
+        project = _project_dict(row)
+        projects[row['id']] = project
+        project_ids[changes.project_key(project)] = row['id']
+    config_ids = {}
+    rows = conn.execute("SELECT * FROM configurations WHERE location = ? AND removed_run IS NULL ORDER BY id", (location,))
+    for row in rows:
+        project = projects[row['project_id']]
+        config = _config_dict(row)
+        project['configurations'].append(config)
+        ids = config_ids.setdefault(changes.project_key(project), {})
+        ids.setdefault(changes.config_key(config), []).append(row['id'])
+    return list(projects.values()), project_ids, config_ids
+
+
+def save_metrics(run_id, phases, counters, db_path=DEFAULT_DB):
+    """Store the phase timings {phase: (seconds, calls)} and counters {name: value} of a run"""
+    rows = [(run_id, 'phase_seconds', phase, seconds, calls) for phase, (seconds, calls) in phases.items()]
+    rows += [(run_id, name, '', value, None) for name, value in counters.items()]
+    with closing(connect(db_path)) as conn, conn:
+        conn.executemany("INSERT OR REPLACE INTO run_metrics (run_id, name, phase, value, calls) VALUES (?, ?, ?, ?, ?)", rows)
+
+
+def run_metrics(run_id, db_path=DEFAULT_DB):
+    """{'phases': {phase: (seconds, calls)}, 'counters': {name: value}} of a run, None if it has none"""
+    if not os.path.exists(db_path):
+        return None
+    with closing(connect(db_path)) as conn:
+        rows = conn.execute("SELECT * FROM run_metrics WHERE run_id = ? ORDER BY rowid", (run_id,)).fetchall()
+    if not rows:
+        return None
+    metrics = {'phases': {}, 'counters': {}}
+    for row in rows:
+        if row['name'] == 'phase_seconds':
+            metrics['phases'][row['phase']] = (row['value'], row['calls'])
+        else:
+            metrics['counters'][row['name']] = row['value']
+    return metrics
+
+
+def load_projects(location, db_path=DEFAULT_DB):
+    """Current projects of `location`, or None if it was never scraped"""
+    if not os.path.exists(db_path):
+        return None
+    with closing(connect(db_path)) as conn:
+        if conn.execute("SELECT 1 FROM scrape_runs WHERE location = ? LIMIT 1", (location,)).fetchone() is None:
+            return None
+        return _current_snapshot(conn, location)[0]
+
+
+def last_run(location, db_path=DEFAULT_DB):
+    """The latest scrape_runs row of `location` as a dict, None if never scraped"""
+    if not os.path.exists(db_path):
+        return None
+    with closing(connect(db_path)) as conn:
+        row = conn.execute("SELECT * FROM scrape_runs WHERE location = ? ORDER BY id DESC LIMIT 1", (location,)).fetchone()
+        return dict(row) if row else None
+
+
+def locations(db_path=DEFAULT_DB):
+    """Locations with at least one stored scrape"""
+    if not os.path.exists(db_path):
+        return []
+    with closing(connect(db_path)) as conn:
+        return [row[0] for row in conn.execute("SELECT DISTINCT location FROM scrape_runs ORDER BY location")]
+
+
+def query_configurations(price_range=None, bhk_counts=None, area_range=None, possession_months=None,
+                         locations=None, db_path=DEFAULT_DB):
+    """Filter the current configurations of every location in SQL.
+
+    Each range is an inclusive (low, high) tuple, None to skip that filter;
+    configurations without a parsed area or possession month are kept.
+    Returns dict rows joining the configuration with its project.
+    """
+    clauses = ["c.removed_run IS NULL"]
+    params = []
+    if price_range:
+        clauses.append("c.price_inr BETWEEN ? AND ?")
+        params += list(price_range)
+    if bhk_counts:
+        clauses.append(f"c.bhk_count IN ({','.join('?' * len(bhk_counts))})")
+        params += list(bhk_counts)
+    if area_range:
+        clauses.append("(c.carpet_sqft IS NULL OR c.carpet_sqft BETWEEN ? AND ?)")
+        params += list(area_range)
+    if possession_months:
+        clauses.append("(p.possession_month IS NULL OR p.possession_month BETWEEN ? AND ?)")
+        params += list(possession_months)
+    if locations:
+        clauses.append(f"c.location IN ({','.join('?' * len(locations))})")
+        params += list(locations)
+    sql = ("SELECT c.location, p.project_name, p.builder_name, p.possession_date, p.possession_month,"
+           " c.bhk, c.size, c.price, c.price_inr, c.carpet_sqft, c.bhk_count"
+           " FROM configurations c JOIN projects p ON p.id = c.project_id"
+           f" WHERE {' AND '.join(clauses)} ORDER BY c.price_inr")
+    with closing(connect(db_path)) as conn:
+        return [dict(row) for row in conn.execute(sql, params)]
+
+
+def price_history(location, project_name, db_path=DEFAULT_DB):
+    """Every price a project's configurations were listed at, oldest first.
+
+    `removed_at` is None for prices still listed. A configuration carried over
+    to a new row in the same run (e.g. on a possession change) stays one entry.
+    """
+    with closing(connect(db_path)) as conn:
+        rows = conn.execute(
+            "SELECT c.run_id, c.removed_run, r.scraped_at, removed.scraped_at AS removed_at,"
+            " c.bhk, c.size, c.price, c.price_inr"
+            " FROM configurations c JOIN projects p ON p.id = c.project_id JOIN scrape_runs r ON r.id = c.run_id"
+            " LEFT JOIN scrape_runs removed ON removed.id = c.removed_run"
+            " WHERE p.location = ? AND p.project_name = ? ORDER BY c.run_id, c.id",
+            (location, project_name),
+        ).fetchall()
+    history = []
+    closed = {}  # (removed_run, bhk, size, price) -> entries, to join with rows reopened in that run
+    for row in rows:
+        reopened = closed.get((row['run_id'], row['bhk'], row['size'], row['price']))
+        entry = reopened.pop(0) if reopened else None
+        if entry is None:
+            entry = {'scraped_at': row['scraped_at'], 'bhk': row['bhk'], 'size': row['size'], 'price': row['price'],
+                     'price_inr': row['price_inr']}
+            history.append(entry)
+        entry['removed_at'] = row['removed_at']
+        if row['removed_run'] is not None:
+            closed.setdefault((row['removed_run'], row['bhk'], row['size'], row['price']), []).append(entry)
+    return history
+
+
+def possession_history(location, project_name, db_path=DEFAULT_DB):
+    """Every possession date a project was listed with, oldest first; `removed_at` is None for the current one"""
+    with closing(connect(db_path)) as conn:
+        rows = conn.execute(
+            "SELECT r.scraped_at, removed.scraped_at AS removed_at, p.possession_date, p.possession_month,"
+            " p.ready_to_move FROM projects p JOIN scrape_runs r ON r.id = p.run_id"
+            " LEFT JOIN scrape_runs removed ON removed.id = p.removed_run"
+            " WHERE p.location = ? AND p.project_name = ? ORDER BY p.run_id, p.id",
+            (location, project_name),
+        )
+        return [dict(row) for row in rows]
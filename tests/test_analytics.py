@@ -0,0 +1,104 @@
+import math
+
+import numpy as np
+import pytest
+
+import analytics
+import records
+
+
+def project(name, configs, possession='Dec, 2027'):
+    return {'project_name': name, 'builder_name': f"{name} Builders", 'possession_date': possession,
+            'configurations': [{'bhk': bhk, 'size': f"{area} sq.ft.", 'price': price} for bhk, area, price in configs]}
+
+
+PROJECTS = {
+    'baner': records.normalize_projects([
+        project('A', [('2 BHK', 700, '70 L'), ('3 BHK', 1000, '1.2 Cr')]),  # 10000, 12000 per sq.ft.
+        project('B', [('2 BHK', 800, '64 L')]),  # 8000
+        project('C', [('2 BHK', 600, '72 L'), ('2 BHK', 650, 'Price on Request')]),  # 12000, no price
+        project('D', [('3 BHK', 1000, '1 Cr')]),  # 10000
+    ]),
+    'wakad': records.normalize_projects([
+        project('W', [('2 BHK', 1000, '60 L'), ('Shop', 200, '30 L')]),  # 6000, 15000 without a BHK
+    ]),
+    'ravet': [],
+}
+
+
+@pytest.fixture(scope='module')
+def table():
+    return analytics.build_market_table(PROJECTS)
+
+
+@pytest.fixture(scope='module')
+def aggregates(table):
+    return analytics.market_aggregates(table)
+
+
+def test_market_table(table):
+    assert len(table) == 8
+    assert sorted(table['location'].cat.categories) == ['baner', 'wakad']
+    # Same project_idx in two locations, different projects
+    assert table['project_key'].nunique() == 5
+    assert table['ppsf'].isna().sum() == 1
+    row = table.loc[(table['project_name'] == 'A') & (table['bhk_count'] == 2)].iloc[0]
+    assert row['ppsf'] == pytest.approx(10000)
+
+
+def test_locality_aggregates(aggregates):
+    locality = aggregates['locality']
+    assert locality.loc['baner', 'projects'] == 4
+    # The unpriced configuration is left out
+    assert locality.loc['baner', 'configs'] == 5
+    assert locality.loc['baner', 'ppsf_p50'] == pytest.approx(10000)
+    assert locality.loc['wakad', 'configs'] == 2
+
+
+def test_bhk_aggregates_leave_out_unknown_bedrooms(aggregates):
+    assert list(aggregates['bhk'].index) == [2.0, 3.0]
+    assert aggregates['bhk'].loc[2.0, 'configs'] == 4
+    assert aggregates['locality_bhk'].loc[('baner', 2.0), 'ppsf_p50'] == pytest.approx(10000)
+    assert aggregates['locality_bhk'].loc[('baner', 2.0), 'ppsf_p25'] == pytest.approx(9000)
+
+
+def test_project_discount_against_location_median(aggregates):
+    ranked = aggregates['project_bhk'].set_index(['project_name', 'bhk_count'])
+    assert ranked.loc[('B', 2.0), 'peer_ppsf'] == pytest.approx(10000)
+    assert ranked.loc[('B', 2.0), 'peers'] == 3
+    assert ranked.loc[('B', 2.0), 'discount'] == pytest.approx(0.2)
+    assert ranked.loc[('C', 2.0), 'discount'] == pytest.approx(-0.2)
+
+
+def test_best_value(aggregates):
+    best = analytics.best_value(aggregates)
+    assert list(zip(best['project_name'], best['bhk_count'])) == [('B', 2.0), ('A', 2.0), ('C', 2.0)]
+    # 3 BHK in baner and every wakad group have fewer than three projects to compare with
+    assert analytics.best_value(aggregates, bhk_counts=[3.0]).empty
+    assert list(analytics.best_value(aggregates, price_range=(0, 6900000))['project_name']) == ['B']
+    assert list(analytics.best_value(aggregates, min_peers=1, locations=['wakad'])['project_name']) == ['W']
+
+
+def test_compare_localities(aggregates):
+    pivot = analytics.compare_localities(aggregates)
+    assert list(pivot.index) == ['wakad', 'baner']
+    assert list(pivot.columns) == ['2 BHK', '3 BHK']
+    assert pivot.loc['baner', '3 BHK'] == pytest.approx(11000)
+    assert math.isnan(pivot.loc['wakad', '3 BHK'])
+    assert list(analytics.compare_localities(aggregates, ['baner'], [3.0]).columns) == ['3 BHK']
+
+
+def test_market_mask_and_stats(table):
+    mask = analytics.market_mask(table, ['baner'], [2.0])
+    assert mask.sum() == 4
+    stats = analytics.ppsf_stats(table, mask)
+    assert (stats['min'], stats['max']) == (8000, 12000)
+    assert analytics.ppsf_stats(table, np.zeros(len(table), dtype=bool)) is None
+
+
+def test_empty_market():
+    table = analytics.build_market_table({'ravet': []})
+    assert len(table) == 0
+    aggregates = analytics.market_aggregates(table)
+    assert aggregates['project_bhk'].empty
+    assert analytics.best_value(aggregates).empty
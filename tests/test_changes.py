@@ -0,0 +1,55 @@
+import changes
+
+
+def project(name, possession='Dec, 2027', configs=(('2 BHK', '700 sq.ft.', '70 L'),), builder='Kolte Patil'):
+    return {
+        'project_name': name,
+        'builder_name': builder,
+        'possession_date': possession,
+        'configurations': [{'bhk': bhk, 'size': size, 'price': price} for bhk, size, price in configs],
+    }
+
+
+def test_identical_snapshots_have_no_delta():
+    old = [project('A'), project('B')]
+    delta = changes.diff_projects(old, [project('B'), project('A')])
+    assert not delta
+    assert delta.unchanged == 2
+
+
+def test_added_removed_and_changed_projects():
+    old = [project('A'), project('B'), project('C')]
+    new = [project('A'), project('B', configs=[('2 BHK', '700 sq.ft.', '72 L')]), project('D')]
+    delta = changes.diff_projects(old, new)
+    assert [p['project_name'] for p in delta.added] == ['D']
+    assert [p['project_name'] for p in delta.removed] == ['C']
+    [change] = delta.changed
+    assert change.new['project_name'] == 'B' and not change.possession_changed
+    assert [c['price'] for c in change.added_configs] == ['72 L']
+    assert [c['price'] for c in change.removed_configs] == ['70 L']
+    assert delta.config_counts() == (2, 2)
+
+
+def test_same_name_from_another_builder_is_another_project():
+    delta = changes.diff_projects([project('A', builder='X')], [project('A', builder='Y')])
+    assert len(delta.added) == len(delta.removed) == 1
+
+
+def test_configuration_order_is_ignored():
+    configs = [('2 BHK', '700 sq.ft.', '70 L'), ('3 BHK', '950 sq.ft.', '1 Cr')]
+    delta = changes.diff_projects([project('A', configs=configs)], [project('A', configs=configs[::-1])])
+    assert not delta
+
+
+def test_duplicate_configurations_are_counted():
+    one = ('2 BHK', '700 sq.ft.', '70 L')
+    delta = changes.diff_projects([project('A', configs=[one])], [project('A', configs=[one, one])])
+    [change] = delta.changed
+    assert (len(change.added_configs), len(change.removed_configs)) == (1, 0)
+
+
+def test_possession_change():
+    delta = changes.diff_projects([project('A')], [project('A', possession='Jun, 2028')])
+    [change] = delta.changed
+    assert change.possession_changed
+    assert change.added_configs == change.removed_configs == []
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import config_table
+import records
+
+FILTERS = ((0, 50000000), [], (datetime(2020, 1, 1), datetime(2040, 12, 31)), (0, 5000))
+
+
+def projects():
+    return records.normalize_projects([
+        {'project_name': f"Project {i}", 'builder_name': f"Builder {i % 3}", 'possession_date': 'Dec, 2027',
+         'configurations': [{'bhk': f"{bhk} BHK", 'size': f"{500 + 100 * bhk + i} sq.ft.", 'price': f"{40 + 10 * i + bhk} L"}
+                            for bhk in (1, 2, 3)]}
+        for i in range(10)
+    ])
+
+
+def test_group_projects_builds_only_the_page():
+    data = projects()
+    table = config_table.build_config_table(data)
+    mask = config_table.filter_mask(table, *FILTERS) & config_table.bhk_mask(table, ['2 BHK', '3 BHK'])
+    every = config_table.group_projects(table, mask, data)
+    assert [len(p['configurations']) for p in every] == [2] * 10
+
+    page = config_table.group_projects(table, mask, data, order=[7, 2, 5])
+    assert page == [every[7], every[2], every[5]]
+    # The source records are left untouched
+    assert all(len(p['configurations']) == 3 for p in data)
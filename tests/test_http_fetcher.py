@@ -0,0 +1,79 @@
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import main
+from records import Project
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures')
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def serve():
+    """Start a stub http.server on a directory and return its base URL"""
+    servers = []
+
+    def start(directory):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=directory))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # The snapshot, SQLite store and metrics file are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def expected_projects(html_content):
+    projects = main.filter_sold_out(list(main.parse_projects(html_content)))
+    return [Project.from_dict(p).to_dict() for p in projects]
+
+
+def test_scrape_fixture_page(serve):
+    base_url = serve(FIXTURES)
+    fetcher = main.HttpFetcher()
+    try:
+        projects = main.scrape('tathawade', 2500000, 9999999999, '', [fetcher], base_url=base_url,
+                               export_json=False, log=lambda *args: None)
+    finally:
+        fetcher.close()
+    with open(os.path.join(FIXTURES, 'tathawade', 'index.html'), encoding='utf-8') as f:
+        assert projects == expected_projects(f.read())
+    assert projects
+
+
+def test_meta_charset_is_honoured(serve, tmp_path):
+    # http.server sends text/html without a charset; the page declares UTF-8 in a <meta> tag only
+    location = tmp_path / 'site' / 'sud'
+    location.mkdir(parents=True)
+    (location / 'index.html').write_bytes(
+        '<html><head><meta charset="utf-8"></head><body>'
+        '<div class="bg-white border rounded-sm"><h3 class="font-bold text-primary">Pixel ₹ Süd</h3>'
+        '<div class="text-[#234e70] list-fx-features"><div class="text-xs">2 BHK</div>'
+        '<div class="text-xs">700 sq.ft.</div><div class="text-xs">₹ 70 L</div></div></div>'
+        '</body></html>'.encode('utf-8'))
+    base_url = serve(str(tmp_path / 'site'))
+    fetcher = main.HttpFetcher()
+    try:
+        projects = main.scrape('sud', 0, 1, '', [fetcher], base_url=base_url, export_json=False,
+                               log=lambda *args: None)
+    finally:
+        fetcher.close()
+    assert [p['project_name'] for p in projects] == ['Pixel ₹ Süd']
+    assert projects[0]['configurations'][0]['price'] == '₹ 70 L'
@@ -0,0 +1,99 @@
+import os
+import re
+
+import pytest
+from bs4 import BeautifulSoup
+
+from main import PARSERS, parse_projects
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures', 'tathawade', 'index.html')
+
+
+def baseline_parse(html_content):
+    """The original single-pass BeautifulSoup parser, kept as the reference output"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    projects = []
+    for card in soup.find_all('div', class_=re.compile(r'bg-white.*border.*rounded-sm')):
+        project_data = {}
+        project_name_elem = card.find('h3', class_=re.compile(r'.*font-bold.*text-primary.*'))
+        if project_name_elem:
+            project_data['project_name'] = project_name_elem.text.strip()
+        builder_elem = card.find('a', href=re.compile(r'/builder/'))
+        if builder_elem:
+            builder_name = builder_elem.find('p')
+            if builder_name:
+                project_data['builder_name'] = builder_name.text.strip()
+        possession_elem = card.find('span', class_='text-[#0E8744]')
+        if possession_elem:
+            project_data['possession_date'] = possession_elem.text.strip()
+        configurations = []
+        for config_div in card.find_all('div', class_=re.compile(r'text-\[#234e70\].*list-fx-features')):
+            items = config_div.find_all('div', class_='text-xs')
+            if len(items) >= 3:
+                configurations.append({'bhk': items[0].text.strip(), 'size': items[1].text.strip(),
+                                       'price': items[2].text.strip()})
+        project_data['configurations'] = configurations
+        if 'project_name' in project_data:
+            projects.append(project_data)
+    return projects
+
+
+def card(name='<h3 class="text-lg font-bold text-primary">Pixel</h3>',
+         builder='<a href="/builder/kohinoor"><p>Kohinoor Group</p></a>',
+         possession='<span class="text-[#0E8744]">Dec, 2027</span>', configs=(('2 BHK', '752 sq.ft.', '78.5 L'),),
+         inner=''):
+    rows = "".join(
+        '<div class="text-[#234e70] flex list-fx-features">'
+        + "".join(f'<div class="text-xs">{item}</div>' for item in row) + '</div>'
+        for row in configs)
+    return f'<div class="bg-white border border-gray rounded-sm">{name}{builder}{inner}{possession}{rows}</div>'
+
+
+def page(*cards):
+    return f"<html><body><main>{''.join(cards)}</main></body></html>"
+
+
+EDGE_CASES = {
+    'nested matching div': page(card(inner='<div class="bg-white border rounded-sm badge">New</div>')),
+    'nested card with a name': page(card(inner=card(name='<h3 class="font-bold text-primary">Inner</h3>'))),
+    'entities': page(card(name='<h3 class="font-bold text-primary">Pixel &amp; Co &#8377; S&uuml;d</h3>',
+                          configs=(('2 BHK', '752 sq.ft.', '&#8377; 78.5 L'),))),
+    'br in text': page(card(name='<h3 class="font-bold text-primary">Viva<br>Pixel</h3>',
+                            builder='<a href="/builder/x"><p>Kohinoor<br/>Group</p></a>')),
+    'missing name': page(card(name=''), card()),
+    'missing builder': page(card(builder='')),
+    'builder link without p': page(card(builder='<a href="/builder/x">Kohinoor</a>')),
+    'missing possession': page(card(possession='')),
+    'short config row': page(card(configs=(('2 BHK', '752 sq.ft.'), ('3 BHK', '1054 sq.ft.', '1.05 Cr')))),
+    'no configurations': page(card(configs=())),
+    'whitespace': page(card(name='<h3 class="font-bold text-primary">\n   Pixel \t</h3>')),
+    'no cards': page('<div class="bg-white">not a card</div>'),
+    'empty page': '',
+}
+
+
+def fixture_page():
+    with open(FIXTURE, encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('parser', sorted(PARSERS))
+def test_fixture_matches_baseline(parser):
+    html_content = fixture_page()
+    expected = baseline_parse(html_content)
+    assert expected
+    assert list(parse_projects(html_content, parser)) == expected
+
+
+@pytest.mark.parametrize('parser', sorted(PARSERS))
+@pytest.mark.parametrize('case', sorted(EDGE_CASES))
+def test_edge_cases_match_baseline(parser, case):
+    html_content = EDGE_CASES[case]
+    assert list(parse_projects(html_content, parser)) == baseline_parse(html_content)
+
+
+def test_nested_matching_div_keeps_the_project():
+    for parser in PARSERS:
+        projects = list(parse_projects(EDGE_CASES['nested matching div'], parser))
+        assert [p['project_name'] for p in projects] == ['Pixel']
+        assert projects[0]['builder_name'] == 'Kohinoor Group'
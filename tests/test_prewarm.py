@@ -0,0 +1,20 @@
+import jobs
+import prewarm
+import scrape_cache
+from main import COMMON_LOCATIONS
+
+
+def make_prewarmer():
+    scheduler = jobs.JobScheduler()
+    return prewarm.Prewarmer(scrape_cache.ScrapeCache(), scheduler, lambda location: (lambda job: None),
+                             seed=COMMON_LOCATIONS)
+
+
+def test_idle_app_scrapes_nothing():
+    assert make_prewarmer().tick() == []
+
+
+def test_only_requested_locations_are_refreshed():
+    prewarmer = make_prewarmer()
+    prewarmer.record_request('baner')
+    assert prewarmer.tick() == ['baner']
@@ -0,0 +1,142 @@
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, CircuitOpenError, FetchError, RateLimiter, RetryPolicy
+
+
+class Clock:
+    """Stands in for time.monotonic and time.sleep in resilience"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(resilience.time, 'sleep', clock.sleep)
+    return clock
+
+
+def flaky(failures, error=ConnectionError):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error(f"attempt {len(calls)}")
+        return len(calls)
+    return fn, calls
+
+
+def test_retry_succeeds_after_failures(clock):
+    fn, calls = flaky(2)
+    assert RetryPolicy(attempts=3, base=0.5).call(fn, (ConnectionError,)) == 3
+    assert len(clock.sleeps) == 2
+
+
+def test_retry_gives_up_with_the_last_error(clock):
+    fn, calls = flaky(5)
+    with pytest.raises(ConnectionError, match="attempt 3"):
+        RetryPolicy(attempts=3).call(fn, (ConnectionError,))
+    assert len(calls) == 3
+    assert len(clock.sleeps) == 2
+
+
+def test_other_errors_are_not_retried(clock):
+    fn, calls = flaky(1, error=ValueError)
+    with pytest.raises(ValueError):
+        RetryPolicy(attempts=3).call(fn, (ConnectionError,))
+    assert len(calls) == 1
+
+
+def test_backoff_is_jittered_and_capped(monkeypatch):
+    monkeypatch.setattr(resilience.random, 'uniform', lambda low, high: high)
+    policy = RetryPolicy(base=0.5, cap=3.0)
+    assert [policy.delay(attempt) for attempt in range(5)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+    monkeypatch.setattr(resilience.random, 'uniform', lambda low, high: low)
+    assert policy.delay(4) == 0
+
+
+def test_retry_after_is_honoured(clock):
+    def fn():
+        if not clock.sleeps:
+            error = ConnectionError("429")
+            error.retry_after = 7
+            raise error
+        return "ok"
+    assert RetryPolicy(base=0.1, cap=1.0).call(fn, (ConnectionError,)) == "ok"
+    assert clock.sleeps == [7]
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.check('housiey.com')
+        breaker.record_failure('housiey.com')
+    assert breaker.state('housiey.com') == "closed"
+    breaker.record_failure('housiey.com')
+    assert breaker.state('housiey.com') == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check('housiey.com')
+    # Other hosts are unaffected
+    breaker.check('example.com')
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure('housiey.com')
+    breaker.record_success('housiey.com')
+    breaker.record_failure('housiey.com')
+    assert breaker.state('housiey.com') == "closed"
+
+
+def test_half_open_trial_closes_or_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure('housiey.com')
+    clock.now += 61
+    assert breaker.state('housiey.com') == "half-open"
+    breaker.check('housiey.com')  # this caller is the trial
+    with pytest.raises(CircuitOpenError):
+        breaker.check('housiey.com')  # nobody else while the trial runs
+    breaker.record_failure('housiey.com')
+    assert breaker.state('housiey.com') == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check('housiey.com')
+
+    clock.now += 61
+    breaker.check('housiey.com')
+    breaker.record_success('housiey.com')
+    assert breaker.state('housiey.com') == "closed"
+    breaker.check('housiey.com')
+
+
+def test_abandoned_trial_is_given_up_on(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure('housiey.com')
+    clock.now += 61
+    breaker.check('housiey.com')
+    clock.now += 61
+    breaker.check('housiey.com')  # a new trial, the first one never reported back
+
+
+def test_rate_limiter_allows_a_burst_then_waits(clock):
+    limiter = RateLimiter(rate=2.0, burst=3)
+    assert [limiter.acquire('housiey.com') for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire('housiey.com') == pytest.approx(0.5)
+    assert limiter.acquire('example.com') == 0.0
+
+
+def test_exit_codes():
+    assert [e.exit_code for e in (resilience.ScrapeError("x"), FetchError("x", 503), CircuitOpenError("x"),
+                                  resilience.NoResultsError("x"))] == [1, 3, 4, 5]
+    assert FetchError("gone", 404).status == 404
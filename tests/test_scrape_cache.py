@@ -0,0 +1,111 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scrape_cache import ScrapeCache
+
+
+def blocking_loader(result, started, release, calls):
+    def load():
+        calls.append(result)
+        started.set()
+        assert release.wait(5)
+        return result
+    return load
+
+
+def test_concurrent_loads_share_one_call():
+    cache = ScrapeCache()
+    started, release, calls = threading.Event(), threading.Event(), []
+    with ThreadPoolExecutor(4) as pool:
+        first = pool.submit(cache.get_or_load, 'baner', blocking_loader(['scraped'], started, release, calls))
+        assert started.wait(5)
+        others = [pool.submit(cache.get_or_load, 'baner', lambda: calls.append('again')) for _ in range(3)]
+        time.sleep(0.05)
+        release.set()
+        assert first.result() == ['scraped']
+        assert [f.result() for f in others] == [['scraped']] * 3
+    assert calls == [['scraped']]
+    assert cache.get('baner') == ['scraped']
+    assert not cache.is_loading('baner')
+
+
+def test_loader_error_reaches_every_waiter_and_is_not_cached():
+    cache = ScrapeCache()
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        assert release.wait(5)
+        raise RuntimeError("housiey is down")
+
+    with ThreadPoolExecutor(2) as pool:
+        first = pool.submit(cache.get_or_load, 'baner', failing)
+        assert started.wait(5)
+        waiter = pool.submit(cache.get_or_load, 'baner', lambda: ['unused'])
+        time.sleep(0.05)
+        release.set()
+        for future in (first, waiter):
+            with pytest.raises(RuntimeError):
+                future.result()
+    assert cache.get('baner') is None
+    assert cache.get_or_load('baner', lambda: ['retried']) == ['retried']
+
+
+def test_none_is_not_cached():
+    cache = ScrapeCache()
+    assert cache.get_or_load('baner', lambda: None) is None
+    assert cache.get_or_load('baner', lambda: ['loaded']) == ['loaded']
+
+
+def test_force_ignores_the_cached_entry():
+    cache = ScrapeCache()
+    cache.put('baner', ['old'])
+    assert cache.get_or_load('baner', lambda: ['new'], force=True) == ['new']
+    assert cache.get('baner') == ['new']
+
+
+def test_force_waits_for_a_plain_load_then_runs_its_own():
+    cache = ScrapeCache()
+    started, release, calls = threading.Event(), threading.Event(), []
+    with ThreadPoolExecutor(2) as pool:
+        disk = pool.submit(cache.get_or_load, 'baner', blocking_loader(['disk'], started, release, calls))
+        assert started.wait(5)
+        scrape = pool.submit(cache.get_or_load, 'baner', lambda: calls.append('scrape') or ['scraped'], force=True)
+        time.sleep(0.05)
+        assert not scrape.done()
+        release.set()
+        assert disk.result() == ['disk']
+        assert scrape.result() == ['scraped']
+    assert calls == [['disk'], 'scrape']
+    assert cache.get('baner') == ['scraped']
+
+
+def test_forced_loads_are_shared():
+    cache = ScrapeCache()
+    started, release, calls = threading.Event(), threading.Event(), []
+    with ThreadPoolExecutor(2) as pool:
+        first = pool.submit(cache.get_or_load, 'baner', blocking_loader(['scraped'], started, release, calls),
+                            force=True)
+        assert started.wait(5)
+        second = pool.submit(cache.get_or_load, 'baner', lambda: calls.append('again'), force=True)
+        # A plain read joins the running scrape too
+        plain = pool.submit(cache.get_or_load, 'baner', lambda: calls.append('disk'))
+        time.sleep(0.05)
+        release.set()
+        assert first.result() == second.result() == plain.result() == ['scraped']
+    assert calls == [['scraped']]
+
+
+def test_expired_entries_are_reloaded_and_lru_evicted():
+    cache = ScrapeCache(max_entries=2, ttls={'wakad': 0})
+    cache.put('wakad', ['w'])
+    time.sleep(0.01)
+    assert cache.get('wakad') is None
+    cache.put('baner', ['b'])
+    cache.put('hinjewadi', ['h'])
+    cache.get('baner')
+    cache.put('moshi', ['m'])
+    assert cache.locations() == ['baner', 'moshi']
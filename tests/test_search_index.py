@@ -0,0 +1,81 @@
+import pytest
+
+import search_index
+from search_index import SearchIndex
+
+ENTRIES = [
+    (0, "Kolte Patil Life Republic", "Kolte Patil Developers"),
+    (1, "Godrej Woodsville", "Godrej Properties"),
+    (2, "Pride World City", "Pride Group"),
+    (3, "Lodha Belmondo", "Lodha Group"),
+    (4, "Republic Heights", "Kolte Patil Developers"),
+    (5, "Woodland Residency", "Shapoorji"),
+]
+
+
+@pytest.fixture
+def index():
+    return SearchIndex(ENTRIES)
+
+
+def ids(results):
+    return [doc_id for doc_id, _ in results]
+
+
+def test_exact_match_ranks_first(index):
+    results = index.search("godrej")
+    assert ids(results) == [1]
+    assert results[0][1] == search_index.EXACT
+
+
+def test_prefix_match(index):
+    assert set(ids(index.search("wood"))) == {1, 5}
+    assert ids(index.search("belm")) == [3]
+
+
+def test_project_name_outranks_builder_name(index):
+    # Kolte is in the project name of 0 but only in the builder name of 4
+    results = dict(index.search("kolte"))
+    assert set(results) == {0, 4}
+    assert results[0] > results[4]
+
+
+def test_every_token_has_to_match(index):
+    assert ids(index.search("kolte republic")) == [0, 4]
+    assert index.search("kolte godrej") == []
+
+
+def test_typo_tolerance(index):
+    assert ids(index.search("godrek")) == [1]
+    assert ids(index.search("belmondoo")) == [3]
+    assert set(ids(index.search("republik"))) == {0, 4}
+    # A transposition is two edits, more than a six letter word allows
+    assert index.search("godrje") == []
+
+
+def test_fuzzy_ranks_below_exact(index):
+    exact = dict(index.search("pride"))[2]
+    typo = dict(index.search("pryde"))[2]
+    assert typo < exact
+
+
+def test_short_tokens_are_not_fuzzy(index):
+    # Too short for edits or infixes: only exact and prefix matches count
+    assert index.search("xo") == []
+    assert ids(index.search("lo")) == [3]
+
+
+def test_infix_match(index):
+    assert ids(index.search("ville")) == [1]
+
+
+def test_limit_and_empty_query(index):
+    assert len(index.search("group", limit=1)) == 1
+    assert index.search("") == []
+    assert index.search("  ,. ") == []
+
+
+def test_edit_distance():
+    assert search_index.edit_distance("godrej", "godrje", 2) == 2
+    assert search_index.edit_distance("kolte", "kolte", 1) == 0
+    assert search_index.edit_distance("a", "abcdef", 2) == 3
@@ -0,0 +1,81 @@
+from contextlib import contextmanager
+
+import pytest
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException, WebDriverException
+
+import main
+from resilience import FetchError, RateLimiter, RetryPolicy
+
+
+class FakeDriver:
+    def __init__(self, get_errors=(), alive=True):
+        self.get_errors = list(get_errors)
+        self.alive = alive
+        self.gets = 0
+
+    def get(self, url):
+        self.gets += 1
+        if self.get_errors:
+            raise self.get_errors.pop(0)
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise WebDriverException("chrome not reachable")
+        return "http://listing/"
+
+    def find_elements(self, *args):
+        raise WebDriverException("chrome not reachable")
+
+
+class FakePool:
+    def __init__(self, driver=None, error=None):
+        self.driver = driver
+        self.error = error
+        self.broken = []
+
+    @contextmanager
+    def session(self, timeout=None):
+        if self.error:
+            raise self.error
+        try:
+            yield self.driver
+        except Exception:
+            self.broken.append(self.driver)
+            raise
+
+
+def fetcher(pool):
+    return main.SeleniumFetcher(pool, retry=RetryPolicy(attempts=3, base=0), limiter=RateLimiter(rate=1000, burst=100))
+
+
+def fetch(pool):
+    return list(fetcher(pool).fetch("http://listing/", log=lambda *args: None))
+
+
+def test_no_free_browser_is_a_fetch_error():
+    with pytest.raises(FetchError, match="No browser free"):
+        fetch(FakePool(error=TimeoutError("Timed out waiting for a free browser")))
+
+
+def test_browser_crash_after_navigation_is_a_fetch_error():
+    pool = FakePool(FakeDriver())
+    with pytest.raises(FetchError, match="Browser failed"):
+        fetch(pool)
+    assert pool.broken == [pool.driver]
+
+
+def test_navigation_is_retried_on_a_live_session():
+    driver = FakeDriver(get_errors=[TimeoutException("page load")])
+    fetcher(FakePool(driver)).navigate(driver, "http://listing/", log=lambda *args: None)
+    assert driver.gets == 2
+
+
+@pytest.mark.parametrize('driver', [
+    FakeDriver(get_errors=[InvalidSessionIdException("invalid session id")] * 3),
+    FakeDriver(get_errors=[WebDriverException("disconnected")] * 3, alive=False),
+])
+def test_dead_session_is_not_retried(driver):
+    with pytest.raises(FetchError, match="session lost"):
+        fetcher(FakePool(driver)).navigate(driver, "http://listing/", log=lambda *args: None)
+    assert driver.gets == 1
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+import records
+import snapshot
+
+
+def projects(prefix, count=3):
+    return [records.Project.from_dict({
+        'project_name': f"{prefix} {i}",
+        'builder_name': 'Kolte Patil' if i % 2 else None,
+        'possession_date': 'Ready To Move' if i == 0 else f"Dec, {2026 + i}",
+        'configurations': [{'bhk': f"{bhk} BHK", 'size': f"{500 + 150 * bhk} sq.ft.", 'price': f"{40 + 20 * bhk + i} L"}
+                           for bhk in range(1, i + 2)],
+    }).to_dict() for i in range(count)]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'snapshots.bin')
+
+
+def test_round_trip(path):
+    baner, wakad = projects('Baner'), projects('Wakad', 5)
+    snapshot.save_many({'baner': baner, 'wakad': wakad}, path)
+    assert snapshot.load_projects('baner', path) == baner
+    assert snapshot.load_projects('wakad', path) == wakad
+    assert snapshot.load_projects('ravet', path) is None
+
+
+def test_round_trip_keeps_missing_optional_keys_out():
+    [project] = snapshot.decode_projects(snapshot.encode_projects(projects('Baner', 1)))
+    assert 'builder_name' not in project
+    assert project['ready_to_move'] is True
+
+
+def test_manifest(path):
+    snapshot.save_projects('wakad', projects('Wakad', 4), path)
+    snapshot.save_projects('baner', projects('Baner', 2), path)
+    manifest = snapshot.read_manifest(path)
+    assert snapshot.locations(path) == ['baner', 'wakad']
+    assert (manifest['wakad']['projects'], manifest['wakad']['configs']) == (4, 10)
+    assert (manifest['baner']['projects'], manifest['baner']['configs']) == (2, 3)
+    # Blocks are laid out back to back in location order
+    assert manifest['baner']['offset'] == 0
+    assert manifest['wakad']['offset'] == manifest['baner']['length']
+
+
+def test_saving_a_location_keeps_the_others(path):
+    wakad = projects('Wakad')
+    snapshot.save_many({'baner': projects('Baner'), 'wakad': wakad}, path)
+    replaced = projects('New Baner', 1)
+    snapshot.save_projects('baner', replaced, path)
+    assert snapshot.load_projects('baner', path) == replaced
+    assert snapshot.load_projects('wakad', path) == wakad
+    assert snapshot.read_manifest(path)['baner']['projects'] == 1
+
+
+def test_missing_file(path):
+    assert snapshot.read_manifest(path) == {}
+    assert snapshot.locations(path) == []
+    assert snapshot.load_projects('baner', path) is None
+
+
+def test_not_a_snapshot(path):
+    with open(path, 'wb') as f:
+        f.write(b"not a snapshot at all")
+    with pytest.raises(ValueError):
+        snapshot.load_projects('baner', path)
+
+
+def test_import_json_files(tmp_path, path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    raw = [{'project_name': 'Pride World City', 'builder_name': 'Pride', 'possession_date': 'Dec, 2027',
+            'configurations': [{'bhk': '2 BHK', 'size': '750 sq.ft.', 'price': '85 L'}]}]
+    (tmp_path / 'projects_data_charholi.json').write_text(json.dumps(raw), encoding='utf-8')
+    assert snapshot.import_json_files(path=path) == ['charholi']
+    assert snapshot.load_projects('charholi', path) == records.normalize_projects(raw)
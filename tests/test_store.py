@@ -0,0 +1,79 @@
+import pytest
+
+import records
+import store
+
+
+def project(name, possession='Dec, 2027', configs=(('2 BHK', '700 sq.ft.', '70 L'),), builder='Kolte Patil'):
+    return records.Project.from_dict({
+        'project_name': name,
+        'builder_name': builder,
+        'possession_date': possession,
+        'configurations': [{'bhk': bhk, 'size': size, 'price': price} for bhk, size, price in configs],
+    }).to_dict()
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / 'listings.db')
+
+
+def names(projects):
+    return sorted(p['project_name'] for p in projects)
+
+
+def test_first_delta_inserts_everything(db):
+    run_id, delta = store.save_delta('baner', [project('A'), project('B')], 'http', db_path=db)
+    assert [p['project_name'] for p in delta.added] == ['A', 'B']
+    assert names(store.load_projects('baner', db_path=db)) == ['A', 'B']
+    run = store.last_run('baner', db_path=db)
+    assert (run['id'], run['incremental'], run['projects_added']) == (run_id, 1, 2)
+
+
+def test_delta_writes_only_changes(db):
+    store.save_delta('baner', [project('A'), project('B'), project('C')], db_path=db)
+    scrape = [project('A'), project('B', configs=[('2 BHK', '700 sq.ft.', '72 L'), ('3 BHK', '950 sq.ft.', '1.1 Cr')]),
+              project('D')]
+    _, delta = store.save_delta('baner', scrape, db_path=db)
+    assert ([p['project_name'] for p in delta.added], [p['project_name'] for p in delta.removed]) == (['D'], ['C'])
+    assert delta.unchanged == 1 and len(delta.changed) == 1
+
+    current = {p['project_name']: p for p in store.load_projects('baner', db_path=db)}
+    assert sorted(current) == ['A', 'B', 'D']
+    assert sorted(c['price'] for c in current['B']['configurations']) == ['1.1 Cr', '72 L']
+    # The replaced price is closed, not overwritten
+    history = store.price_history('baner', 'B', db_path=db)
+    assert [(h['price'], h['removed_at'] is None) for h in history] == [('70 L', False), ('72 L', True), ('1.1 Cr', True)]
+
+
+def test_unchanged_scrape_writes_no_rows(db):
+    store.save_delta('baner', [project('A')], db_path=db)
+    _, delta = store.save_delta('baner', [project('A')], db_path=db)
+    assert not delta
+    assert len(store.price_history('baner', 'A', db_path=db)) == 1
+
+
+def test_possession_change_is_versioned(db):
+    store.save_delta('baner', [project('A', configs=[('2 BHK', '700 sq.ft.', '70 L'), ('3 BHK', '950 sq.ft.', '1 Cr')])],
+                     db_path=db)
+    moved = project('A', possession='Jun, 2028', configs=[('2 BHK', '700 sq.ft.', '70 L'), ('3 BHK', '950 sq.ft.', '1.05 Cr')])
+    _, delta = store.save_delta('baner', [moved], db_path=db)
+    assert delta.changed[0].possession_changed
+
+    [current] = store.load_projects('baner', db_path=db)
+    assert current['possession_date'] == 'Jun, 2028'
+    assert sorted(c['price'] for c in current['configurations']) == ['1.05 Cr', '70 L']
+    history = store.possession_history('baner', 'A', db_path=db)
+    assert [(h['possession_date'], h['removed_at'] is None) for h in history] == [('Dec, 2027', False), ('Jun, 2028', True)]
+    # The unchanged 2 BHK price stays one open entry across the new project version
+    prices = [(h['price'], h['removed_at'] is None) for h in store.price_history('baner', 'A', db_path=db)]
+    assert prices == [('70 L', True), ('1 Cr', False), ('1.05 Cr', True)]
+
+
+def test_locations_are_kept_apart(db):
+    store.save_delta('baner', [project('A')], db_path=db)
+    store.save_delta('wakad', [project('W')], db_path=db)
+    _, delta = store.save_delta('baner', [project('B')], db_path=db)
+    assert [p['project_name'] for p in delta.removed] == ['A']
+    assert names(store.load_projects('wakad', db_path=db)) == ['W']
+    assert store.locations(db_path=db) == ['baner', 'wakad']